@@ -1,15 +1,34 @@
 import asyncio
 import threading
+from itertools import accumulate
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, List, Tuple, cast
-from polymarket_bot.models import WsBookMessage, WsPriceChangeMessage, WsTickSizeChangeMessage
+from typing import Dict, Iterable, List, Tuple
+from polymarket_bot.models import PRICE_LUT, WsBookMessage, WsPriceChange, WsPriceChangeMessage, WsTickSizeChangeMessage
 
 type PriceSize = Tuple[float, float]
 
+# Ticks for which every cent price is already on-grid, so PRICE_LUT values need no quantizing
+_CENT_ALIGNED_TICKS = frozenset((0.01, 0.001, 0.0001))
+
 class OrderBook:
     """
     Thread-safe Event-Driven Order Book.
     """
+    # One instance per tracked asset, read on every feed event; slots keep it compact.
+    __slots__ = (
+        "asset_id",
+        "lock",
+        "updated_event",
+        "loop",
+        "bids",
+        "asks",
+        "tick_size",
+        "ready",
+        "msg_count",
+        "_version",
+        "_top_cache",
+    )
+
     def __init__(self, asset_id: str) -> None:
         self.asset_id = asset_id
         self.lock = threading.Lock()
@@ -32,6 +51,9 @@ class OrderBook:
         self.tick_size = 0.01
         self.ready = False
         self.msg_count = 0
+        # Bumped under the lock on every ladder mutation; keys the cached top of book.
+        self._version = 0
+        self._top_cache: Tuple[int, float | None, float | None] = (-1, None, None)
 
     def _trigger_update(self) -> None:
         """Schedules the optional event trigger on an asyncio loop."""
@@ -41,7 +63,7 @@ class OrderBook:
 
     def _safe_float(self, val: object) -> float:
         try:
-            return float(cast(float | str, val))
+            return float(val)  # type: ignore[arg-type]
         except (ValueError, TypeError):
             return 0.0
 
@@ -52,6 +74,13 @@ class OrderBook:
         quant = (Decimal(str(price)) / tick).to_integral_value(rounding=ROUND_HALF_UP) * tick
         return float(quant)
 
+    def _parse_price(self, raw: object) -> float:
+        if type(raw) is str and self.tick_size in _CENT_ALIGNED_TICKS:
+            p = PRICE_LUT.get(raw)
+            if p is not None:
+                return p
+        return self._quantize(self._safe_float(raw))
+
     def on_tick_size_change(self, msg: WsTickSizeChangeMessage) -> None:
         if msg.get("asset_id") != self.asset_id:
             return
@@ -76,15 +105,17 @@ class OrderBook:
                 asks[qp] = asks.get(qp, 0.0) + s
             self.bids = bids
             self.asks = asks
+            self._version += 1
         self._trigger_update()
 
     def _apply_price_change(self, msg: WsPriceChangeMessage) -> None:
-        changes = msg.get("price_changes", [])
+        asset_id = self.asset_id
+        self._apply_changes([ch for ch in msg.get("price_changes", []) if ch.get("asset_id") == asset_id])
+
+    def _apply_changes(self, changes: Iterable[WsPriceChange]) -> None:
         for ch in changes:
-            if ch.get("asset_id") != self.asset_id:
-                continue
             side = str(ch.get("side", "")).upper()
-            p = self._quantize(self._safe_float(ch.get("price")))
+            p = self._parse_price(ch.get("price"))
             s = self._safe_float(ch.get("size"))
             target_dict = self.bids if side == "BUY" else self.asks
             if s < 1e-9:
@@ -99,32 +130,33 @@ class OrderBook:
             self.msg_count += 1
             bids_raw = msg.get("bids", [])
             asks_raw = msg.get("asks", [])
-            inferred = self._infer_tick_size(bids_raw, asks_raw)
+            # Each wire price is converted once and shared by tick inference and the ladders
+            safe_float = self._safe_float
+            bid_prices = [safe_float(level.get("price")) for level in bids_raw]
+            ask_prices = [safe_float(level.get("price")) for level in asks_raw]
+            inferred = self._infer_tick_size(bid_prices + ask_prices)
             if inferred is not None and inferred > 0 and inferred != self.tick_size:
                 self.tick_size = inferred
-            self.bids.clear()
-            self.asks.clear()
-            for level in bids_raw:
-                self.bids[self._quantize(self._safe_float(level.get("price")))] = self._safe_float(level.get("size"))
-            for level in asks_raw:
-                self.asks[self._quantize(self._safe_float(level.get("price")))] = self._safe_float(level.get("size"))
+            self.bids = self._build_ladder(bids_raw, bid_prices)
+            self.asks = self._build_ladder(asks_raw, ask_prices)
             self.ready = True
+            self._version += 1
         self._trigger_update()
 
-    def _infer_tick_size(
-        self,
-        bids: list[dict[str, object]],
-        asks: list[dict[str, object]],
-    ) -> float | None:
-        prices: list[float] = []
-        for level in bids:
-            p = self._safe_float(level.get("price"))
-            if p > 0:
-                prices.append(p)
-        for level in asks:
-            p = self._safe_float(level.get("price"))
-            if p > 0:
-                prices.append(p)
+    def _build_ladder(self, levels: list[dict[str, object]], prices: list[float]) -> Dict[float, float]:
+        # Same result as _parse_price per level, reusing the already-converted price floats
+        safe_float = self._safe_float
+        quantize = self._quantize
+        lut = PRICE_LUT if self.tick_size in _CENT_ALIGNED_TICKS else None
+        ladder: Dict[float, float] = {}
+        for level, price in zip(levels, prices):
+            raw = level.get("price")
+            p = lut.get(raw) if lut is not None and type(raw) is str else None
+            ladder[p if p is not None else quantize(price)] = safe_float(level.get("size"))
+        return ladder
+
+    def _infer_tick_size(self, raw_prices: list[float]) -> float | None:
+        prices = [p for p in raw_prices if p > 0]
         if len(prices) < 2:
             return None
         prices = sorted(set(prices))
@@ -148,20 +180,43 @@ class OrderBook:
             if not self.ready:
                 return
             self._apply_price_change(msg)
+            self._version += 1
+        self._trigger_update()
+
+    def on_price_changes(self, changes: Iterable[WsPriceChange]) -> None:
+        """Same as on_price_change, for entries a feed handler already grouped to this asset."""
+        with self.lock:
+            self.msg_count += 1
+            if not self.ready:
+                return
+            self._apply_changes(changes)
+            self._version += 1
         self._trigger_update()
 
     def get_snapshot(self, limit: int | None = 50) -> Tuple[List[PriceSize], List[PriceSize]]:
         with self.lock:
-            bids_sorted = sorted(self.bids.items(), key=lambda x: x[0], reverse=True)
-            asks_sorted = sorted(self.asks.items(), key=lambda x: x[0])
-            if limit is None:
-                return bids_sorted, asks_sorted
-            return bids_sorted[:limit], asks_sorted[:limit]
+            bids = self.bids
+            asks = self.asks
+            # Sort the bare float prices (list.sort's float fast path, no key calls) and
+            # only build (price, size) pairs for the levels that survive the limit.
+            bid_prices = sorted(bids, reverse=True)
+            ask_prices = sorted(asks)
+            if limit is not None:
+                bid_prices = bid_prices[:limit]
+                ask_prices = ask_prices[:limit]
+            return [(p, bids[p]) for p in bid_prices], [(p, asks[p]) for p in ask_prices]
+
+    def best_bid_ask(self) -> Tuple[float | None, float | None]:
+        """Top of book without sorting or materializing the ladders."""
+        # Lock-free hit: the tuple is replaced whole, and a stale version just misses.
+        version, best_bid, best_ask = self._top_cache
+        if version == self._version:
+            return best_bid, best_ask
+        with self.lock:
+            best_bid = max(self.bids) if self.bids else None
+            best_ask = min(self.asks) if self.asks else None
+            self._top_cache = (self._version, best_bid, best_ask)
+        return best_bid, best_ask
 
     def get_cumulative_values(self, levels: List[PriceSize]) -> List[float]:
-        out: List[float] = []
-        total = 0.0
-        for price, size in levels:
-            total += price * size
-            out.append(total)
-        return out
+        return list(accumulate(price * size for price, size in levels))
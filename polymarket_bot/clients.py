@@ -2,25 +2,31 @@ from __future__ import annotations
 
 import json
 import os
+import socket
+import sys
 import threading
 import time
 
 import requests
 import websocket
 from decimal import Decimal, InvalidOperation
-from typing import Any, Callable, Literal, Protocol, TypedDict, cast
+from typing import Any, Callable, Literal, Protocol, Sequence, cast
 
 from polymarket_bot.config import GAMMA_URL, REST_URL, WSS_URL, WSS_USER_URL
 from polymarket_bot.models import (
+    COLLATERAL,
     BalanceAllowanceResponse,
     GammaEvent,
     Order,
+    Position,
     TradeActivity,
     WebSocketAppProto,
     WsBookMessage,
     WsPriceChangeMessage,
     WsLastTradePriceMessage,
     WsTickSizeChangeMessage,
+    dumps_ws,
+    loads_json,
 )
 
 # External Lib Imports
@@ -55,34 +61,6 @@ class LastTradeCallback(Protocol):
 Side = Literal["BUY", "SELL"]
 
 
-class Position(TypedDict, total=False):
-    proxyWallet: str
-    asset: str
-    conditionId: str
-    size: float
-    avgPrice: float
-    initialValue: float
-    currentValue: float
-    cashPnl: float
-    percentPnl: float
-    totalBought: float
-    realizedPnl: float
-    percentRealizedPnl: float
-    curPrice: float
-    redeemable: bool
-    mergeable: bool
-    title: str
-    slug: str
-    icon: str
-    eventSlug: str
-    outcome: str
-    outcomeIndex: int
-    oppositeOutcome: str
-    oppositeAsset: str
-    endDate: str
-    negativeRisk: bool
-
-
 class PolyClient:
     """
     Handles HTTP (Gamma & Data API) Requests and CLOB Helpers.
@@ -200,27 +178,31 @@ class PolyClient:
         try:
             resp = self.session.get(REST_URL, params=params, timeout=self.timeout)
             resp.raise_for_status()
-            return cast(list[TradeActivity], resp.json())
+            return cast(list[TradeActivity], loads_json(resp.content))
         except Exception as e:
             print(f"❌ Trade Fetch Error: {e}")
             return []
 
-    def get_positions(self, user_address: str, limit: int = 100) -> list[Position]:
+    def fetch_positions(self, user_address: str, limit: int = 100) -> list[Position]:
+        """Like get_positions, but raises on network/API errors instead of returning []."""
         url = os.getenv("POLY_POSITIONS_URL", "https://data-api.polymarket.com/positions")
         params: dict[str, str] = {"user": user_address, "limit": str(limit)}
-        try:
-            resp = self.session.get(url, params=params, timeout=self.timeout)
-            resp.raise_for_status()
+        resp = self.session.get(url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
 
-            data_obj: object = resp.json()
-            if not isinstance(data_obj, list):
-                return []
+        data_obj: object = resp.json()
+        if not isinstance(data_obj, list):
+            raise ValueError(f"Unexpected positions payload: {type(data_obj).__name__}")
 
-            out: list[Position] = []
-            for item_obj in data_obj: # type: ignore
-                if isinstance(item_obj, dict):
-                    out.append(cast(Position, cast(dict[str, object], item_obj)))
-            return out
+        out: list[Position] = []
+        for item_obj in data_obj: # type: ignore
+            if isinstance(item_obj, dict):
+                out.append(cast(Position, cast(dict[str, object], item_obj)))
+        return out
+
+    def get_positions(self, user_address: str, limit: int = 100) -> list[Position]:
+        try:
+            return self.fetch_positions(user_address, limit=limit)
         except Exception as e:
             print(f"❌ Positions Fetch Error: {e}")
             return []
@@ -241,11 +223,8 @@ class PolyClient:
         """
         client = self._get_trading_clob_client()
 
-        asset_enum = (
-            ClobAssetType.COLLATERAL
-            if asset_type.upper() == "COLLATERAL"
-            else ClobAssetType.CONDITIONAL
-        )
+        is_collateral = asset_type.upper() == COLLATERAL
+        asset_enum = ClobAssetType.COLLATERAL if is_collateral else ClobAssetType.CONDITIONAL
         params = ClobBalanceAllowanceParams(asset_type=asset_enum, token_id=token_id) # type: ignore
         if signature_type is not None:
             params.signature_type = signature_type
@@ -266,7 +245,7 @@ class PolyClient:
             return Decimal(0)
 
         def _format_amount(dec: Decimal) -> str:
-            if asset_type.upper() == "COLLATERAL" and dec == dec.to_integral_value():
+            if is_collateral and dec == dec.to_integral_value():
                 dec = dec / Decimal("1000000")
             return format(dec, "f")
 
@@ -511,6 +490,9 @@ class PolyClient:
         if self._api_creds is not None:
             return self._api_creds
         client = self._get_trading_clob_client()
+        # Building the trading client already derives and caches the creds.
+        if self._api_creds is not None:
+            return self._api_creds
         creds = client.create_or_derive_api_creds()  # type: ignore
         self._api_creds = creds
         return creds
@@ -717,6 +699,37 @@ class OddsApiClient:
             return []
 
 
+# event_type -> PolySocket callback attribute; one dict probe replaces the if/elif chain
+_WS_EVENT_HANDLERS: dict[str, str] = {
+    "book": "on_book",
+    "price_change": "on_price_change",
+    "tick_size_change": "on_tick_size_change",
+    "last_trade_price": "on_last_trade",
+}
+
+_SIDES: dict[str, str] = {"BUY": "BUY", "SELL": "SELL"}
+
+# Applied after websocket-client's defaults (which already set TCP_NODELAY and keepalive).
+# A 1 MiB receive buffer absorbs the book-snapshot bursts that follow a (re)subscribe.
+_MARKET_WS_SOCKOPT: tuple[tuple[int, int, int], ...] = ((socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20),)
+
+
+def _intern_ids(ev: dict[str, Any]) -> None:
+    # Share one str object per asset id so active_books lookups hit the identity fast path
+    aid = ev.get("asset_id")
+    if type(aid) is str:
+        ev["asset_id"] = sys.intern(aid)
+    changes = ev.get("price_changes")
+    if type(changes) is list:
+        for ch in changes:
+            aid = ch.get("asset_id")
+            if type(aid) is str:
+                ch["asset_id"] = sys.intern(aid)
+            side = ch.get("side")
+            if side in _SIDES:
+                ch["side"] = _SIDES[side]
+
+
 class PolySocket:
     """
     Handles WebSocket (CLOB) Connections
@@ -761,7 +774,9 @@ class PolySocket:
                 on_error=self._on_error,
                 on_close=self._on_close,
             )
-            cast(WebSocketAppProto, self.ws).run_forever(ping_interval=30, ping_timeout=10)
+            cast(WebSocketAppProto, self.ws).run_forever(
+                sockopt=_MARKET_WS_SOCKOPT, ping_interval=30, ping_timeout=10
+            )
             with self._asset_lock:
                 self._subscribed_assets.clear()
                 self.ws = None
@@ -782,7 +797,7 @@ class PolySocket:
         if not self._is_ws_open(ws):
             return False
         try:
-            ws.send(json.dumps(payload))
+            ws.send(dumps_ws(payload))
             return True
         except Exception as e:
             print(f"{err_label}: {e}")
@@ -861,31 +876,32 @@ class PolySocket:
 
     def _on_message(self, ws: websocket.WebSocketApp, msg_str: str) -> None:
         try:
-            data: Any = json.loads(msg_str)
+            data: Any = loads_json(msg_str)
         except json.JSONDecodeError:
             return
 
-        events: list[dict[str, Any]]
-        if isinstance(data, list):
+        # Decoded JSON is always an exact list/dict, so skip isinstance's subclass walk.
+        # The market channel sends arrays; a lone event is wrapped in a tuple, not a new list.
+        events: Sequence[dict[str, Any]]
+        t = type(data)
+        if t is list:
             events = cast(list[dict[str, Any]], data)
-        elif isinstance(data, dict):
-            events = [cast(dict[str, Any], data)]
+        elif t is dict:
+            events = (cast(dict[str, Any], data),)
         else:
             return
 
         for ev in events:
-            etype = str(ev.get("event_type", ""))
-
-            if etype == "book" and self.on_book:
-                self.on_book(cast(WsBookMessage, ev))
-
-            elif etype == "price_change" and self.on_price_change:
-                self.on_price_change(cast(WsPriceChangeMessage, ev))
-
-            elif etype == "tick_size_change" and self.on_tick_size_change:
-                self.on_tick_size_change(cast(WsTickSizeChangeMessage, ev))
-            elif etype == "last_trade_price" and self.on_last_trade:
-                self.on_last_trade(cast(WsLastTradePriceMessage, ev))
+            event_type = ev.get("event_type")
+            if type(event_type) is not str:
+                continue
+            attr = _WS_EVENT_HANDLERS.get(event_type)
+            if attr is None:
+                continue
+            handler = getattr(self, attr)
+            if handler:
+                _intern_ids(ev)
+                handler(ev)
 
     def _on_error(self, ws: websocket.WebSocketApp, error: object) -> None:
         print(f"WebSocket Error: {error}")
@@ -953,22 +969,26 @@ class UserSocket:
             auth_msg["markets"] = self.markets
         self._last_payload = auth_msg
         print(f"User WS subscribe payload (redacted): {self._redact(auth_msg)}")
-        ws.send(json.dumps(auth_msg))
+        ws.send(dumps_ws(auth_msg))
 
     def _on_message(self, ws: websocket.WebSocketApp, msg_str: str) -> None:
         self.last_message_ts = time.time()
         # print(f"User WS message: {msg_str}")
         try:
-            data: Any = json.loads(msg_str)
+            data: Any = loads_json(msg_str)
         except json.JSONDecodeError:
             return
 
-        if isinstance(data, dict) and self.on_event:
-            self.on_event(cast(dict[str, Any], data))
-        elif isinstance(data, list) and self.on_event:
+        on_event = self.on_event
+        if on_event is None:
+            return
+        t = type(data)
+        if t is dict:
+            on_event(cast(dict[str, Any], data))
+        elif t is list:
             for item in data:
-                if isinstance(item, dict):
-                    self.on_event(cast(dict[str, Any], item))
+                if type(item) is dict:
+                    on_event(cast(dict[str, Any], item))
 
     def _on_error(self, ws: websocket.WebSocketApp, error: object) -> None:
         self.connected = False
@@ -27,8 +27,8 @@ class PolymarketEngine:
                 clob_raw = m.get('clobTokenIds', '[]')
                 
                 try:
-                    outcomes_any = json.loads(out_raw)
-                    clob_ids_any = json.loads(clob_raw)
+                    outcomes_any = json.loads(out_raw) if isinstance(out_raw, str) else out_raw
+                    clob_ids_any = json.loads(clob_raw) if isinstance(clob_raw, str) else clob_raw
                     
                     if isinstance(outcomes_any, list) and isinstance(clob_ids_any, list):
                         outcomes_list = cast(List[Any], outcomes_any)
@@ -1,9 +1,14 @@
-from enum import Enum
-from typing import TypedDict, Protocol, Literal, Required, List, Any, NotRequired, Optional
+import json
+from typing import TypedDict, Protocol, Literal, List, Any, NotRequired, Optional, Final
 
-class AssetType(str, Enum):
-    COLLATERAL = "COLLATERAL"
-    CONDITIONAL = "CONDITIONAL"
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None  # type: ignore[assignment]
+
+COLLATERAL: Final = "COLLATERAL"
+CONDITIONAL: Final = "CONDITIONAL"
+AssetType = Literal["COLLATERAL", "CONDITIONAL"]
 
 class BalanceAllowanceParams(TypedDict):
     asset_type: AssetType
@@ -22,88 +27,112 @@ class UserValueEntry(TypedDict):
 
 type UserValueResponse = list[UserValueEntry]
 
+# Structural only (used via cast); deliberately not @runtime_checkable, don't isinstance() it.
 class WebSocketAppProto(Protocol):
-    def run_forever(self, ping_interval: int, ping_timeout: int) -> bool: ...
+    def run_forever(
+        self, ping_interval: int, ping_timeout: int, sockopt: tuple[tuple[int, int, int], ...] = ...
+    ) -> bool: ...
     def send(self, data: str | bytes) -> None: ...
     def close(self) -> None: ...
 
-class GammaMarket(TypedDict, total=False):
+class GammaMarket(TypedDict):
+    id: NotRequired[str]
+    question: NotRequired[str]
+    slug: NotRequired[str]
+    active: NotRequired[bool]
+    closed: NotRequired[bool]
+    liquidity: NotRequired[str]
+    volume: NotRequired[float]
+    # Gamma sends these two as JSON-encoded strings; get_game_data decodes them to lists.
+    outcomes: str | List[str]
+    clobTokenIds: str | List[str]
+    # Float copy of volume, added by get_game_data.
+    volumeNum: NotRequired[float]
+
+class GammaTag(TypedDict):
+    id: str
+    label: NotRequired[str]
+    slug: NotRequired[str]
+
+class GammaEvent(TypedDict):
     id: str
-    question: str
     slug: str
-    active: bool
-    closed: bool
-    liquidity: str
-    volume: float
-    outcomes: Required[List[str]]
-    clobTokenIds:Required [List[str]]
-
-class GammaEvent(TypedDict, total=False):
-    id: Required[str]
-    slug: Required[str]
-    title: Required[str]
-    markets: Required[List[Any]]  # Should ideally be List[Market] later
-    description: str
-    ticker: str
-    resolutionSource: str
-    image: str
-    icon: str
-    startDate: str
-    endDate: str
-    creationDate: str
-    updatedAt: str
-    volume: float
-    volume24hr: float
-    liquidity: float
-    openInterest: float
-    commentCount: int
-    active: bool
-    closed: bool
-    archived: bool
-    new: bool
-    featured: bool
-    restricted: bool
-    enableOrderBook: bool
-    enableNegRisk: bool
-    tags: List[Any]
+    title: str
+    markets: List[GammaMarket]
+    description: NotRequired[str]
+    ticker: NotRequired[str]
+    resolutionSource: NotRequired[str]
+    image: NotRequired[str]
+    icon: NotRequired[str]
+    startDate: NotRequired[str]
+    endDate: NotRequired[str]
+    creationDate: NotRequired[str]
+    updatedAt: NotRequired[str]
+    volume: NotRequired[float]
+    volume24hr: NotRequired[float]
+    liquidity: NotRequired[float]
+    openInterest: NotRequired[float]
+    commentCount: NotRequired[int]
+    active: NotRequired[bool]
+    closed: NotRequired[bool]
+    archived: NotRequired[bool]
+    new: NotRequired[bool]
+    featured: NotRequired[bool]
+    restricted: NotRequired[bool]
+    enableOrderBook: NotRequired[bool]
+    enableNegRisk: NotRequired[bool]
+    tags: NotRequired[List[GammaTag]]
 
 # --- WebSocket Message Types ---
-class WsBookLevel(TypedDict, total=False):
-    price: str
-    size: str
-
-class WsBookMessage(TypedDict, total=False):
-    event_type: str
-    asset_id: str
-    buys: list[WsBookLevel]
-    sells: list[WsBookLevel]
-    bids: list[WsBookLevel]
-    asks: list[WsBookLevel]
-
-class WsPriceChange(TypedDict, total=False):
-    asset_id: str
-    side: str
-    price: str
-    size: str
-
-class WsPriceChangeMessage(TypedDict, total=False):
-    event_type: str
-    price_changes: list[WsPriceChange]
-
-class WsTickSizeChangeMessage(TypedDict, total=False):
-    event_type: str
-    asset_id: str
-    tick_size: str
-
-class WsLastTradePriceMessage(TypedDict, total=False):
-    event_type: str
-    asset_id: str
-    fee_rate_bps: str
-    market: str
-    price: str
-    side: Literal["BUY", "SELL"]
-    size: str
-    timestamp: str
+# Cent-tick prices ("0.01".."0.99" plus 0/1) cover nearly every level on the wire.
+PRICE_LUT: dict[str, float] = {}
+for _i in range(101):
+    PRICE_LUT[f"{_i / 100:.2f}"] = _i / 100
+    PRICE_LUT[str(_i / 100)] = _i / 100
+PRICE_LUT["0"] = 0.0
+PRICE_LUT["1"] = 1.0
+del _i
+
+def to_price(raw: str) -> float:
+    p = PRICE_LUT.get(raw)
+    return p if p is not None else float(raw)
+
+class WsBookLevel(TypedDict):
+    price: NotRequired[str]
+    size: NotRequired[str]
+
+class WsBookMessage(TypedDict):
+    event_type: NotRequired[str]
+    asset_id: NotRequired[str]
+    buys: NotRequired[list[WsBookLevel]]
+    sells: NotRequired[list[WsBookLevel]]
+    bids: NotRequired[list[WsBookLevel]]
+    asks: NotRequired[list[WsBookLevel]]
+
+class WsPriceChange(TypedDict):
+    asset_id: NotRequired[str]
+    side: NotRequired[str]
+    price: NotRequired[str]
+    size: NotRequired[str]
+
+class WsPriceChangeMessage(TypedDict):
+    event_type: NotRequired[str]
+    price_changes: NotRequired[list[WsPriceChange]]
+
+class WsTickSizeChangeMessage(TypedDict):
+    event_type: NotRequired[str]
+    asset_id: NotRequired[str]
+    tick_size: NotRequired[str]
+
+class WsLastTradePriceMessage(TypedDict):
+    event_type: NotRequired[str]
+    asset_id: NotRequired[str]
+    fee_rate_bps: NotRequired[str]
+    market: NotRequired[str]
+    price: NotRequired[str]
+    side: NotRequired[Literal["BUY", "SELL"]]
+    size: NotRequired[str]
+    timestamp: NotRequired[str]
 
 class Token(TypedDict):
     token_id: str
@@ -115,33 +144,60 @@ class Market(TypedDict):
     question: str
     condition_id: str
     slug: str
-    tokens: list[Token]
+    tokens: tuple[Token, Token]  # binary markets: always exactly YES/NO
 
 TradeSide = Literal["BUY", "SELL"]
 TradeType = Literal["TRADE"]
 
-class TradeActivity(TypedDict, total=False):
-    proxyWallet: str
-    timestamp: int
-    conditionId: str
-    type: TradeType
-    size: float
-    usdcSize: float
-    transactionHash: str
-    price: float
-    asset: Required[str]
-    side: TradeSide
-    outcomeIndex: int
-    title: str
-    slug: Required[str]
-    icon: str
-    eventSlug: Required[str]
-    outcome: str
-    name: str
-    pseudonym: str
-    bio: str
-    profileImage: str
-    profileImageOptimized: str
+class TradeActivity(TypedDict):
+    proxyWallet: NotRequired[str]
+    timestamp: NotRequired[int]
+    conditionId: NotRequired[str]
+    type: NotRequired[TradeType]
+    size: NotRequired[float]
+    usdcSize: NotRequired[float]
+    transactionHash: NotRequired[str]
+    price: NotRequired[float]
+    asset: str
+    side: NotRequired[TradeSide]
+    outcomeIndex: NotRequired[int]
+    title: NotRequired[str]
+    slug: str
+    icon: NotRequired[str]
+    eventSlug: str
+    outcome: NotRequired[str]
+    name: NotRequired[str]
+    pseudonym: NotRequired[str]
+    bio: NotRequired[str]
+    profileImage: NotRequired[str]
+    profileImageOptimized: NotRequired[str]
+
+class Position(TypedDict):
+    proxyWallet: NotRequired[str]
+    asset: NotRequired[str]
+    conditionId: NotRequired[str]
+    size: NotRequired[float]
+    avgPrice: NotRequired[float]
+    initialValue: NotRequired[float]
+    currentValue: NotRequired[float]
+    cashPnl: NotRequired[float]
+    percentPnl: NotRequired[float]
+    totalBought: NotRequired[float]
+    realizedPnl: NotRequired[float]
+    percentRealizedPnl: NotRequired[float]
+    curPrice: NotRequired[float]
+    redeemable: NotRequired[bool]
+    mergeable: NotRequired[bool]
+    title: NotRequired[str]
+    slug: NotRequired[str]
+    icon: NotRequired[str]
+    eventSlug: NotRequired[str]
+    outcome: NotRequired[str]
+    outcomeIndex: NotRequired[int]
+    oppositeOutcome: NotRequired[str]
+    oppositeAsset: NotRequired[str]
+    endDate: NotRequired[str]
+    negativeRisk: NotRequired[bool]
 
 class Order(TypedDict):
     orderID: str
@@ -156,13 +212,9 @@ class Order(TypedDict):
     owner: str
     hash: str
 
-class MarketWithVolume(GammaMarket):
-    # Extends GammaMarket to include the volumeNum we added in utils
-    volumeNum: float
-
 class UserActivityResponse(TypedDict):
     title: str
-    markets: List[GammaMarket] # We use Any here to avoid circular imports, or use GammaMarket if order permits
+    markets: List[GammaMarket]
 
 class WsBidAsk(TypedDict):
     price: float
@@ -184,3 +236,18 @@ class WsPayload(TypedDict):
     tick_size: NotRequired[float]
     last_trade: NotRequired[WsLastTrade]
     status: NotRequired[str] # Use NotRequired if this key is optional
+
+def loads_json(raw: str | bytes) -> Any:
+    # Shared decoder for WS frames and REST bodies (pass resp.content to skip the resp.text
+    # utf-8 round-trip). orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # catch the same error either way.
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def dumps_ws(obj: object) -> str:
+    # Compact JSON text frame for every socket we write to: frontend pushes (same shape
+    # Starlette's send_json emits) and the upstream subscribe/auth messages
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import json
+import logging
 import os
 import re
+import sys
 import threading
 import time
 from asyncio import AbstractEventLoop, Queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Literal, Set, TypedDict, cast
+from typing import TYPE_CHECKING, Dict, Iterable, Literal, Sequence, Set, TextIO, TypedDict, cast
 
 from polymarket_bot.book import OrderBook
 from polymarket_bot.clients import PolyClient, PolySocket, UserSocket
@@ -18,13 +24,16 @@ from polymarket_bot.models import (
     WsBookMessage,
     WsLastTrade,
     WsLastTradePriceMessage,
+    WsPriceChange,
     WsPriceChangeMessage,
     WsTickSizeChangeMessage,
+    to_price,
 )
 from polymarket_bot.server.helpers import _to_float, _to_int, _to_side
 from polymarket_bot.server.log_archiver import S3LogArchiver
 from polymarket_bot.server.models import AutoPairConfig
 from polymarket_bot.server.settings import (
+    ADAPTIVE_LAST_TRADE_MAX_AGE_S,
     AUTO_SUBSCRIBE_END_DATE_WINDOW_BEFORE_HOURS,
     AUTO_SUBSCRIBE_END_DATE_WINDOW_HOURS,
     AUTO_SUBSCRIBE_GAMESTART_WINDOW_BEFORE_HOURS,
@@ -35,7 +44,14 @@ from polymarket_bot.server.settings import (
     DEFAULT_SMALLEST_SIZE_LEVEL_MIN_BUY_PRICE,
     DEFAULT_SMALLEST_SIZE_LEVEL_MAX_SELL_PRICE,
 )
-from polymarket_bot.server.strategies import OrderIntent, PairContext, get_strategy
+from polymarket_bot.server.strategies import AutoStrategy, OrderIntent, PairContext, get_strategy
+
+if TYPE_CHECKING:
+    import _csv
+
+# Same logger the routes use (server.state); feed handlers log at DEBUG so the
+# per-message formatting is skipped unless it is switched on.
+logger = logging.getLogger("polymarket")
 
 
 class AssetMeta(TypedDict):
@@ -45,6 +61,50 @@ class AssetMeta(TypedDict):
     game_start_ts: float | None
 
 
+# (asset, side, size, price, ttl_seconds, submit_cooldown_s)
+type _AutoOrderJob = tuple[str, str, float, float, int | None, float]
+
+
+def _put_order_payloads(q: Queue[dict[str, object]], payloads: Sequence[dict[str, object]]) -> None:
+    # Order subscriber queues are bounded; a slow client just misses updates.
+    for payload in payloads:
+        try:
+            q.put_nowait(payload)
+        except asyncio.QueueFull:
+            return
+
+_LOGGED_ASSETS_MAX = 4096
+# Metadata for assets that are no longer streamed is dropped after this long untouched.
+_ASSET_META_IDLE_S = 3600.0
+
+
+def _mark_first_seen(seen: OrderedDict[str, None], key: str) -> bool:
+    if key in seen:
+        return False
+    seen[key] = None
+    if len(seen) > _LOGGED_ASSETS_MAX:
+        seen.popitem(last=False)
+    return True
+
+
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+
+
+@lru_cache(maxsize=64)
+def _decimals_for_tick(tick: float) -> int:
+    if not tick or tick <= 0:
+        return 2
+    raw = f"{tick:.10f}".rstrip("0")
+    parts = raw.split(".")
+    return len(parts[1]) if len(parts) > 1 else 0
+
+
+@lru_cache(maxsize=1024)
+def _safe_slug(slug: str) -> str:
+    cleaned = _SLUG_RE.sub("_", slug).strip("_")
+    return cleaned or "unknown"
+
+
 class BookManager:
     def __init__(self) -> None:
         self.active_books: Dict[str, OrderBook] = {}
@@ -52,14 +112,19 @@ class BookManager:
         self.poly_client = PolyClient()
         self._subs: Dict[str, Set[Queue[None]]] = {}
         self._loops: Dict[str, AbstractEventLoop] = {}
+        self._loop_threads: Dict[AbstractEventLoop, int] = {}
+        self._pending_wakes: set[str] = set()
         self._tracked_assets: set[str] = set()
         # Upstream market data socket (server -> Polymarket CLOB WS).
         self._market_feed_socket: PolySocket | None = None
         self._market_feed_socket_lock = threading.Lock()
-        self._logged_books: set[str] = set()
-        self._logged_price_changes: set[str] = set()
+        # FIFO-capped "already logged" markers so long-running servers don't grow them forever.
+        self._logged_books: OrderedDict[str, None] = OrderedDict()
+        self._logged_price_changes: OrderedDict[str, None] = OrderedDict()
         self._order_subs: set[Queue[dict[str, object]]] = set()
         self._order_loops: Dict[Queue[dict[str, object]], AbstractEventLoop] = {}
+        # (queue, loop) pairs rebuilt on (un)register so dispatch is a flat iteration.
+        self._order_sub_pairs: tuple[tuple[Queue[dict[str, object]], AbstractEventLoop], ...] = ()
         self._user_socket: UserSocket | None = None
         self._user_lock = threading.Lock()
         self._last_order_ws_accept_ts: float | None = None
@@ -67,16 +132,29 @@ class BookManager:
         self._last_user_event_ts: float | None = None
         self._last_user_event_type: str | None = None
         self._user_event_count = 0
+        self._user_events_dropped = 0
         self._asset_meta: Dict[str, AssetMeta] = {}
+        # asset_id -> last touch time, oldest first; drives eviction of cold metadata.
+        self._asset_meta_lru: OrderedDict[str, float] = OrderedDict()
         self._market_assets: Dict[str, set[str]] = {}
+        self._market_asset_view: Dict[str, tuple[tuple[str, AssetMeta], ...]] = {}
         self._market_threads: Dict[str, threading.Thread] = {}
         self._market_stops: Dict[str, threading.Event] = {}
         self._market_end_reasons: Dict[str, str] = {}
         self._last_trades: Dict[str, WsLastTrade] = {}
+        # (price * size, received_at) of each asset's last trade, for the adaptive trigger
+        self._last_trade_notional: Dict[str, tuple[float, float]] = {}
         self._auto_pairs: Dict[str, AutoPairConfig] = {}
         self._auto_lock = threading.Lock()
+        # Enabled configs, rebuilt under _auto_lock on every write and rebound in one step so
+        # the auto loop can read it without taking the lock.
+        self._auto_pairs_snapshot: tuple[AutoPairConfig, ...] = ()
+        # Strategy objects resolved at config time, keyed by pair_key (published alongside).
+        self._auto_strategies: Dict[str, AutoStrategy] = {}
         self._auto_stop = threading.Event()
         self._auto_thread: threading.Thread | None = None
+        # Order submit pool; shut down with the loop and rebuilt by _ensure_auto_loop.
+        self._auto_executor: ThreadPoolExecutor | None = self._new_auto_executor()
         self._positions_lock = threading.Lock()
         self._positions_cache: Dict[str, float] = {}
         self._positions_last_fetch = 0.0
@@ -107,9 +185,16 @@ class BookManager:
         self._auto_subscribe_last_error: str | None = None
         self._log_archiver = S3LogArchiver.from_env()
 
+    # _subs/_loops are only mutated from the subscriber's event loop thread.
     def register_subscriber(self, asset_id: str, q: Queue[None], loop: AbstractEventLoop) -> None:
         self._subs.setdefault(asset_id, set()).add(q)
         self._loops.setdefault(asset_id, loop)
+        if loop not in self._loop_threads:
+            try:
+                if asyncio.get_running_loop() is loop:
+                    self._loop_threads[loop] = threading.get_ident()
+            except RuntimeError:
+                pass
 
     def unregister_subscriber(self, asset_id: str, q: Queue[None]) -> None:
         subs = self._subs.get(asset_id)
@@ -120,24 +205,58 @@ class BookManager:
                 self._loops.pop(asset_id, None)
 
     def notify_updated(self, asset_id: str) -> None:
-        subs = self._subs.get(asset_id)
+        # A wake already queued for this asset will observe this update too.
+        if asset_id in self._pending_wakes:
+            return
         loop = self._loops.get(asset_id)
-        if not subs or loop is None:
+        if loop is None:
             return
+        self._pending_wakes.add(asset_id)
+        self._schedule_wake(loop, (asset_id,))
+
+    def notify_updated_many(self, asset_ids: Iterable[str]) -> None:
+        # One wake-up per loop for the whole batch instead of one per (asset, subscriber).
+        by_loop: Dict[AbstractEventLoop, list[str]] = {}
+        pending = self._pending_wakes
+        for asset_id in asset_ids:
+            if asset_id in pending:
+                continue
+            loop = self._loops.get(asset_id)
+            if loop is None:
+                continue
+            pending.add(asset_id)
+            by_loop.setdefault(loop, []).append(asset_id)
+        for loop, loop_assets in by_loop.items():
+            self._schedule_wake(loop, loop_assets)
 
-        for q in tuple(subs):
-            def _put_one(q_local: Queue[None] = q) -> None:
+    def _schedule_wake(self, loop: AbstractEventLoop, asset_ids: Sequence[str]) -> None:
+        try:
+            if self._loop_threads.get(loop) == threading.get_ident():
+                loop.call_soon(self._wake_subscribers, asset_ids)
+            else:
+                loop.call_soon_threadsafe(self._wake_subscribers, asset_ids)
+        except RuntimeError:
+            # Loop already closed; don't leave the assets marked as pending forever.
+            self._pending_wakes.difference_update(asset_ids)
+
+    def _wake_subscribers(self, asset_ids: Sequence[str]) -> None:
+        # Runs on the subscriber loop, which is also the only thread that mutates _subs
+        # (register/unregister are called from websocket handlers), so no snapshot copy.
+        # Clear the pending marks first so updates landing mid-drain schedule a fresh wake.
+        self._pending_wakes.difference_update(asset_ids)
+        for asset_id in asset_ids:
+            for q in self._subs.get(asset_id, ()):
                 try:
-                    q_local.put_nowait(None)
+                    q.put_nowait(None)
                 except Exception:
                     pass
 
-            loop.call_soon_threadsafe(_put_one)
-
     def subscribe_to_asset(self, asset_id: str) -> OrderBook:
-        if asset_id in self.active_books:
+        asset_id = sys.intern(asset_id)
+        book = self.active_books.get(asset_id)
+        if book is not None:
             self.client_counts[asset_id] += 1
-            return self.active_books[asset_id]
+            return book
 
         book = OrderBook(asset_id)
         self.active_books[asset_id] = book
@@ -158,23 +277,34 @@ class BookManager:
                     if not target:
                         return
                     target.on_book_snapshot(msg)
-                    if asset_id_str not in self._logged_books:
-                        self._logged_books.add(asset_id_str)
-                        print(f"Book snapshot received (market_id={asset_id_str})")
+                    if _mark_first_seen(self._logged_books, asset_id_str):
+                        logger.debug("Book snapshot received (asset_id=%s)", asset_id_str)
                     self.notify_updated(asset_id_str)
 
                 def _on_price(msg: WsPriceChangeMessage) -> None:
-                    changes = msg.get("price_changes", [])
-                    assets = {str(ch.get("asset_id")) for ch in changes if ch.get("asset_id")}
-                    for market_id in assets:
+                    # Group the frame's entries by asset in one pass so each book only
+                    # walks its own changes instead of re-filtering the whole frame.
+                    by_asset: Dict[str, list[WsPriceChange]] = {}
+                    for ch in msg.get("price_changes", []):
+                        market_id = ch.get("asset_id")
+                        if not market_id:
+                            continue
+                        group = by_asset.get(market_id)
+                        if group is None:
+                            by_asset[market_id] = [ch]
+                        else:
+                            group.append(ch)
+                    updated: list[str] = []
+                    for market_id, changes in by_asset.items():
                         target = self.active_books.get(market_id)
                         if not target:
                             continue
-                        target.on_price_change(msg)
-                        if market_id not in self._logged_price_changes:
-                            self._logged_price_changes.add(market_id)
-                            print(f"Price change received (market_id={market_id})")
-                        self.notify_updated(market_id)
+                        target.on_price_changes(changes)
+                        if _mark_first_seen(self._logged_price_changes, market_id):
+                            logger.debug("Price change received (asset_id=%s)", market_id)
+                        updated.append(market_id)
+                    if updated:
+                        self.notify_updated_many(updated)
 
                 def _on_tick(msg: WsTickSizeChangeMessage) -> None:
                     msg_asset = msg.get("asset_id")
@@ -185,16 +315,17 @@ class BookManager:
                     if not target:
                         return
                     target.on_tick_size_change(msg)
-                    print(f"Tick size change received (market_id={asset_id_str})")
+                    logger.debug("Tick size change received (asset_id=%s)", asset_id_str)
                     self.notify_updated(asset_id_str)
 
                 def _on_last_trade(msg: WsLastTradePriceMessage) -> None:
-                    msg_asset = msg.get("market_id")
+                    msg_asset = msg.get("asset_id")
                     if not msg_asset:
                         return
                     asset_id_str = str(msg_asset)
                     try:
-                        price_val = float(msg.get("price", "0") or 0)
+                        # Trade prices are cent strings almost always; PRICE_LUT skips the parse
+                        price_val = to_price(msg.get("price", "0") or "0")
                     except (TypeError, ValueError):
                         price_val = 0.0
                     try:
@@ -212,14 +343,15 @@ class BookManager:
                         "side": cast(Literal["BUY", "SELL"], side_val),
                         "timestamp": ts_val,
                     }
-                    # print(
-                    #     "Last trade received (asset_id=%s side=%s price=%s size=%s ts=%s)",
-                    #     asset_id_str,
-                    #     side_val,
-                    #     price_val,
-                    #     size_val,
-                    #     ts_val,
-                    # )
+                    self._last_trade_notional[asset_id_str] = (price_val * size_val, time.time())
+                    logger.debug(
+                        "Last trade received (asset_id=%s side=%s price=%s size=%s ts=%s)",
+                        asset_id_str,
+                        side_val,
+                        price_val,
+                        size_val,
+                        ts_val,
+                    )
                     self.notify_updated(asset_id_str)
 
                 self._market_feed_socket.on_book = _on_book
@@ -259,6 +391,7 @@ class BookManager:
         print(f"Registering order subscriber (pre_count={len(self._order_subs)})")
         self._order_subs.add(q)
         self._order_loops[q] = loop
+        self._rebuild_order_sub_pairs()
         print(f"Order subscriber registered (count={len(self._order_subs)})")
         self._last_order_ws_register_ts = time.time()
         self.ensure_user_socket()
@@ -266,6 +399,7 @@ class BookManager:
     def set_auto_pair(self, config: AutoPairConfig) -> None:
         with self._auto_lock:
             self._auto_pairs[config.pair_key] = config
+            self._publish_auto_pairs()
         if config.enabled:
             try:
                 self.ensure_user_socket()
@@ -281,30 +415,57 @@ class BookManager:
     def clear_auto_pair(self, pair_key: str) -> None:
         with self._auto_lock:
             self._auto_pairs.pop(pair_key, None)
+            self._publish_auto_pairs()
 
     def disable_auto_trading(self) -> None:
         with self._auto_lock:
             self._auto_pairs.clear()
+            self._publish_auto_pairs()
         self._auto_stop.set()
         self._auto_thread = None
+        executor = self._auto_executor
+        self._auto_executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _publish_auto_pairs(self) -> None:
+        # Caller holds _auto_lock.
+        snapshot = tuple(cfg for cfg in self._auto_pairs.values() if cfg.enabled)
+        self._auto_strategies = {cfg.pair_key: get_strategy(cfg.strategy) for cfg in snapshot}
+        self._auto_pairs_snapshot = snapshot
 
     def _ensure_auto_loop(self) -> None:
         if self._auto_thread and self._auto_thread.is_alive():
             return
         self._auto_stop.clear()
+        if self._auto_executor is None:
+            self._auto_executor = self._new_auto_executor()
         self._auto_thread = threading.Thread(target=self._run_auto_loop, daemon=True)
         self._auto_thread.start()
 
+    def _new_auto_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix="auto_order")
+
     def _get_positions_cache(self) -> Dict[str, float]:
+        # Fills from the user socket keep the cache current between fetches (see
+        # _apply_fill_to_positions); REST only acts as a periodic resync. Gate on the
+        # fetch time rather than emptiness so a flat account doesn't refetch every tick.
         now = time.time()
         with self._positions_lock:
-            if self._positions_cache and (now - self._positions_last_fetch) < self._positions_refresh_interval_s:
+            if self._positions_last_fetch and (now - self._positions_last_fetch) < self._positions_refresh_interval_s:
                 return dict(self._positions_cache)
         address = self.poly_client.get_positions_address()
         if not address:
             with self._positions_lock:
                 return dict(self._positions_cache)
-        positions = self.poly_client.get_positions(address, limit=200)
+        try:
+            positions = self.poly_client.fetch_positions(address, limit=200)
+        except Exception as e:
+            # Keep the last known positions and leave the fetch time alone so the next tick
+            # retries; an empty cache here would read as "flat" and keep the BUY side going.
+            print(f"❌ Positions Fetch Error: {e}")
+            with self._positions_lock:
+                return dict(self._positions_cache)
         cache: Dict[str, float] = {}
         for pos in positions:
             asset = str(pos.get("asset") or "")
@@ -342,61 +503,30 @@ class BookManager:
             else:
                 self._positions_cache[asset] = next_size
 
-    def _decimals_for_tick(self, tick: float) -> int:
-        if not tick or tick <= 0:
-            return 2
-        raw = f"{tick:.10f}".rstrip("0")
-        parts = raw.split(".")
-        return len(parts[1]) if len(parts) > 1 else 0
-
-    def _build_bid_placements(self, prices: list[float], tick: float) -> list[float]:
+    def _build_placements(self, prices: list[float], tick: float, direction: int) -> list[float]:
+        # direction=1 walks bids (descending), -1 walks asks (ascending). A gap wider than
+        # one tick gets an extra placement one tick inside it, on the far side from the touch.
         out: list[float] = []
         prev: float | None = None
-        decimals = self._decimals_for_tick(tick)
-
-        def rounded(val: float) -> float:
-            return round(val, decimals)
-
-        def push_unique(val: float) -> None:
-            if not out:
-                out.append(val)
-                return
-            if abs(out[-1] - val) >= tick / 2:
-                out.append(val)
-
+        decimals = _decimals_for_tick(tick)
+        half_tick = tick / 2
+        gap_offset = tick * direction
         for price in prices:
-            if prev is not None and prev - price > tick:
-                push_unique(rounded(price + tick))
-                push_unique(rounded(price))
-            else:
-                push_unique(rounded(price))
+            if prev is not None and (prev - price) * direction > tick:
+                val = round(price + gap_offset, decimals)
+                if not out or abs(out[-1] - val) >= half_tick:
+                    out.append(val)
+            val = round(price, decimals)
+            if not out or abs(out[-1] - val) >= half_tick:
+                out.append(val)
             prev = price
         return out
 
-    def _build_ask_placements(self, prices: list[float], tick: float) -> list[float]:
-        out: list[float] = []
-        prev: float | None = None
-        decimals = self._decimals_for_tick(tick)
-
-        def rounded(val: float) -> float:
-            return round(val, decimals)
-
-        def push_unique(val: float) -> None:
-            if not out:
-                out.append(val)
-                return
-            if abs(out[-1] - val) >= tick / 2:
-                out.append(val)
+    def _build_bid_placements(self, prices: list[float], tick: float) -> list[float]:
+        return self._build_placements(prices, tick, 1)
 
-        for price in prices:
-            if prev is not None and price - prev > tick:
-                # For asks, place inside a gap at the high side (price - tick).
-                push_unique(rounded(price - tick))
-                push_unique(rounded(price))
-            else:
-                push_unique(rounded(price))
-            prev = price
-        return out
+    def _build_ask_placements(self, prices: list[float], tick: float) -> list[float]:
+        return self._build_placements(prices, tick, -1)
 
     def _smallest_level_candidates(self) -> list[int]:
         low = int(min(DEFAULT_SMALLEST_SIZE_LEVEL_MIN_LEVEL, DEFAULT_SMALLEST_SIZE_LEVEL_MAX_LEVEL))
@@ -406,14 +536,27 @@ class BookManager:
         return list(range(high, low - 1, -1))
 
     def _price_for_level(self, book: OrderBook, side: str, level: int) -> float | None:
-        bids, asks = book.get_snapshot(limit=100)
+        tick = book.tick_size or 0.01
+        if level > 0:
+            # Inside-the-spread levels only depend on the touch, so skip the ladders.
+            top_bid, top_ask = book.best_bid_ask()
+            if top_bid is None or top_ask is None:
+                return None
+            spread_steps = int((top_ask - top_bid) / tick) - 1
+            if spread_steps > 0:
+                clamped_level = min(spread_steps, level)
+                if side == "BUY":
+                    return min(top_ask - tick, top_bid + clamped_level * tick)
+                return max(top_bid + tick, top_ask - clamped_level * tick)
+        # Placement i only depends on the first i+1 prices of a side; one spare absorbs
+        # levels that collapse when rounded to the tick.
+        bids, asks = book.get_snapshot(limit=abs(level) + 2)
         if not bids or not asks:
             return None
         bid_prices = [p for p, _ in bids]
         ask_prices = [p for p, _ in asks]
         best_bid = bid_prices[0]
         best_ask = ask_prices[0]
-        tick = book.tick_size or 0.01
         bid_placements = self._build_bid_placements(bid_prices, tick)
         ask_placements = self._build_ask_placements(ask_prices, tick)
 
@@ -440,7 +583,7 @@ class BookManager:
         if not levels:
             return None
         tick = book.tick_size or 0.01
-        decimals = self._decimals_for_tick(tick)
+        decimals = _decimals_for_tick(tick)
         if side == "BUY":
             prices = [float(p) for p, _ in bids]
             placements = self._build_bid_placements(prices, tick)
@@ -479,8 +622,8 @@ class BookManager:
 
     def _run_auto_loop(self) -> None:
         while not self._auto_stop.is_set():
-            with self._auto_lock:
-                configs = [cfg for cfg in self._auto_pairs.values() if cfg.enabled]
+            configs = self._auto_pairs_snapshot
+            auto_strategies = self._auto_strategies
             if not configs:
                 return
             now = time.time()
@@ -532,6 +675,8 @@ class BookManager:
                 continue
 
             positions = self._get_positions_cache()
+            order_jobs: list[_AutoOrderJob] = []
+            queued_keys: set[tuple[str, str]] = set()
             for config in eligible_configs:
                 assets = config.assets[:2]
                 books: Dict[str, OrderBook] = {}
@@ -552,7 +697,7 @@ class BookManager:
                     books[asset] = book
                     prices[asset] = (float(best_bid), float(best_ask))
                     tick = book.tick_size or 0.01
-                    decimals = self._decimals_for_tick(tick)
+                    decimals = _decimals_for_tick(tick)
                     bid_prices = [float(p) for p, _ in bids]
                     ask_prices = [float(p) for p, _ in asks]
                     bid_placements = self._build_bid_placements(bid_prices, tick)
@@ -590,9 +735,14 @@ class BookManager:
                 shares = {a: positions.get(a, 0.0) for a in assets}
                 both_over = all(s >= config.auto_sell_min_shares for s in shares.values())
                 best_bids = {a: prices[a][0] for a in assets}
-                last_trades = {
-                    a: (self._last_trades.get(a) or {}) for a in assets
-                }
+                # Snapshot so the feed thread can't change the trigger mid-decide; trades older
+                # than the window no longer count.
+                notional_cutoff = now - ADAPTIVE_LAST_TRADE_MAX_AGE_S
+                last_notionals: Dict[str, float] = {}
+                for a in assets:
+                    entry = self._last_trade_notional.get(a)
+                    if entry is not None and entry[1] >= notional_cutoff:
+                        last_notionals[a] = entry[0]
                 ctx = PairContext(
                     assets=assets,
                     positions=shares,
@@ -600,11 +750,11 @@ class BookManager:
                     sell_allowed=sell_allowed,
                     both_over=both_over,
                     best_bids=best_bids,
-                    last_trades=last_trades, #type: ignore
+                    last_notionals=last_notionals,
                     level_sizes=level_sizes,
                 )
                 strategy_name = (getattr(config, "strategy", "default") or "default").strip().lower()
-                strategy = get_strategy(strategy_name)
+                strategy = auto_strategies.get(config.pair_key) or get_strategy(strategy_name)
 
                 for asset in assets:
                     if asset in config.disabled_assets:
@@ -665,28 +815,56 @@ class BookManager:
                                 continue
                         price = max(0.01, min(0.99, price))
                         order_size = settings.shares * size_multiplier
-                        try:
-                            self.poly_client.place_limit_order(
-                                token_id=asset,
-                                side=cast(Literal["BUY", "SELL"], trade_side),
-                                size=order_size,
-                                price=price,
-                                ttl_seconds=ttl_seconds,
-                            )
-                            self._auto_last_submit_ts[submit_key] = time.time()
-                            next_wait_s = min(next_wait_s, submit_cooldown_s)
-                        except Exception as e:
-                            meta = self._asset_meta.get(asset, {})
-                            question = meta.get("question") or "unknown"
-                            outcome = meta.get("outcome") or "unknown"
-                            slug = meta.get("slug") or "unknown"
-                            print(
-                                "Auto order failed "
-                                f"(market={question} outcome={outcome} slug={slug} asset={asset} side={trade_side}): {e}"
-                            )
+                        if submit_key in queued_keys:
+                            continue
+                        queued_keys.add(submit_key)
+                        order_jobs.append((asset, trade_side, order_size, price, ttl_seconds, submit_cooldown_s))
+
+            # Submit this round's orders concurrently; each one is an independent REST round-trip.
+            if order_jobs:
+                executor = self._auto_executor
+                if executor is None:
+                    break
+                try:
+                    futures = {executor.submit(self._submit_auto_order, job): job for job in order_jobs}
+                except RuntimeError:
+                    # disable_auto_trading shut the pool down mid-round.
+                    break
+                # Stamp each side's cooldown as its own order lands, not when the slowest one does.
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    error = future.result()
+                    asset, trade_side, _, _, _, submit_cooldown_s = futures[future]
+                    if error is None:
+                        self._auto_last_submit_ts[(asset, trade_side)] = time.time()
+                        next_wait_s = min(next_wait_s, submit_cooldown_s)
+                        continue
+                    meta = self._asset_meta.get(asset, {})
+                    question = meta.get("question") or "unknown"
+                    outcome = meta.get("outcome") or "unknown"
+                    slug = meta.get("slug") or "unknown"
+                    print(
+                        "Auto order failed "
+                        f"(market={question} outcome={outcome} slug={slug} asset={asset} side={trade_side}): {error}"
+                    )
 
             self._auto_stop.wait(max(0.05, min(next_wait_s, 2.0)))
 
+    def _submit_auto_order(self, job: _AutoOrderJob) -> Exception | None:
+        asset, trade_side, order_size, price, ttl_seconds, _ = job
+        try:
+            self.poly_client.place_limit_order(
+                token_id=asset,
+                side=cast(Literal["BUY", "SELL"], trade_side),
+                size=order_size,
+                price=price,
+                ttl_seconds=ttl_seconds,
+            )
+        except Exception as e:
+            return e
+        return None
+
     def _parse_game_start_ts(self, game_start_time: str | None) -> float | None:
         if not game_start_time:
             return None
@@ -713,31 +891,80 @@ class BookManager:
     ) -> None:
         if not slug or not question:
             return
-        meta: AssetMeta = {
-            "slug": slug,
-            "question": question,
-            "outcome": outcome or "",
-            "game_start_ts": self._parse_game_start_ts(game_start_time),
-        }
-        self._asset_meta[asset_id] = meta
+        outcome = outcome or ""
+        game_start_ts = self._parse_game_start_ts(game_start_time)
+        # Token metadata rarely changes between auto-subscribe refreshes; keep the cached entry
+        meta: AssetMeta | None = self._asset_meta.get(asset_id)
+        if (
+            meta is None
+            or meta["slug"] != slug
+            or meta["question"] != question
+            or meta["outcome"] != outcome
+            or meta["game_start_ts"] != game_start_ts
+        ):
+            meta = {
+                "slug": slug,
+                "question": question,
+                "outcome": outcome,
+                "game_start_ts": game_start_ts,
+            }
+            self._asset_meta[asset_id] = meta
+            meta_changed = True
+        else:
+            meta_changed = False
+        self._touch_asset_meta(asset_id)
         key = self._market_key(slug, question)
-        self._market_assets.setdefault(key, set()).add(asset_id)
+        market_assets = self._market_assets.setdefault(key, set())
+        if meta_changed or asset_id not in market_assets:
+            market_assets.add(asset_id)
+            self._rebuild_market_view(key)
         self._ensure_market_logger(key, slug, question)
 
-    def _safe_slug(self, slug: str) -> str:
-        cleaned = re.sub(r"[^a-zA-Z0-9._-]+", "_", slug).strip("_")
-        return cleaned or "unknown"
+    def _touch_asset_meta(self, asset_id: str) -> None:
+        self._asset_meta_lru[asset_id] = time.time()
+        self._asset_meta_lru.move_to_end(asset_id)
+
+    def _evict_cold_asset_meta(self) -> None:
+        # Oldest-first walk; stops at the first entry still inside the idle window. Walks a
+        # copy since feed threads touch the LRU concurrently.
+        cutoff = time.time() - _ASSET_META_IDLE_S
+        cold: list[str] = []
+        for aid, touched in list(self._asset_meta_lru.items()):
+            if touched > cutoff:
+                break
+            if aid not in self.active_books:
+                cold.append(aid)
+        for aid in cold:
+            self._stop_logger(aid)
+
+    def _rebuild_market_view(self, key: str) -> None:
+        # Immutable (asset_id, meta) tuple the market logger iterates each tick; rebuilt only
+        # when the market's asset set or metadata changes. Books are still resolved per tick
+        # because a release/resubscribe swaps the OrderBook instance.
+        view: list[tuple[str, AssetMeta]] = []
+        for aid in self._market_assets.get(key, ()):
+            meta = self._asset_meta.get(aid)
+            if meta:
+                view.append((aid, meta))
+        if view:
+            # Pre-sorted by outcome so the logger's first/second columns need no per-tick sort.
+            view.sort(key=lambda item: item[1]["outcome"])
+            self._market_asset_view[key] = tuple(view)
+        else:
+            self._market_asset_view.pop(key, None)
 
     def _market_key(self, slug: str, question: str) -> str:
-        return f"{self._safe_slug(slug)}::{self._safe_slug(question)}"
+        return f"{_safe_slug(slug)}::{_safe_slug(question)}"
 
     def _ensure_logger(self, asset_id: str) -> None:
         meta = self._asset_meta.get(asset_id)
         if not meta:
             return
+        self._touch_asset_meta(asset_id)
         key = self._market_key(meta["slug"], meta["question"])
         if key not in self._market_assets:
             self._market_assets[key] = {asset_id}
+            self._rebuild_market_view(key)
         self._ensure_market_logger(key, meta["slug"], meta["question"])
 
     def _ensure_market_logger(self, key: str, slug: str, question: str) -> None:
@@ -748,15 +975,12 @@ class BookManager:
 
         def _log_loop() -> None:
             base_dir = Path("logs")
-            folder = base_dir / self._safe_slug(slug)
-            path = folder / f"{self._safe_slug(question)}.csv"
+            folder = base_dir / _safe_slug(slug)
+            path = folder / f"{_safe_slug(question)}.csv"
 
-            def _fmt(val: str) -> str:
-                if val == "":
-                    return ""
-                try:
-                    num = float(val)
-                except (TypeError, ValueError):
+            def _fmt(num: float | None) -> str:
+                # Formats the book's floats directly; no str() -> float() round trip per row.
+                if num is None:
                     return ""
                 return f"{num:.6f}".rstrip("0").rstrip(".")
 
@@ -773,45 +997,49 @@ class BookManager:
             last_snapshot: tuple[float | None, float | None, float | None, float | None] | None = None
             last_logged_snapshot: tuple[float | None, float | None, float | None, float | None] | None = None
             last_change_ts = 0.0
+            last_signature: tuple[tuple[str, int, float], ...] | None = None
+            # The CSV stays open for the logger's lifetime; rows are flushed every 32 rows or 2s.
+            fh: TextIO | None = None
+            writer: _csv.Writer | None = None
+            pending_rows = 0
+            last_flush_ts = 0.0
             while not stop_event.is_set():
                 loop_start = time.time()
-                assets = list(self._market_assets.get(key, set()))
-                rows: list[tuple[str, str, str]] = []
+                view = self._market_asset_view.get(key, ())
+                # Only rebuild the snapshot when one of the market's books actually moved.
+                signature = tuple(
+                    (aid, book.msg_count, book.tick_size) if (book := self.active_books.get(aid)) else (aid, -1, 0.0)
+                    for aid, _ in view
+                )
+                if signature == last_signature:
+                    if fh is not None and pending_rows and loop_start - last_flush_ts >= 2.0:
+                        fh.flush()
+                        pending_rows = 0
+                        last_flush_ts = loop_start
+                    volatile = last_change_ts and (loop_start - last_change_ts) <= 10.0
+                    stop_event.wait(1.0 if volatile or not seen_non_empty else 4.0)
+                    continue
+                last_signature = signature
+                # Raw (outcome, bid, ask) per asset; prices are only formatted when a row is written.
                 raw_rows: list[tuple[str, float | None, float | None]] = []
                 game_start_ts: float | None = None
-                for aid in assets:
-                    meta = self._asset_meta.get(aid)
-                    if not meta:
-                        continue
+                for aid, meta in view:
                     if game_start_ts is None:
                         game_start_ts = meta.get("game_start_ts")
                     outcome = meta.get("outcome", "")
                     book = self.active_books.get(aid)
-                    best_bid = ""
-                    best_ask = ""
                     bid_val: float | None = None
                     ask_val: float | None = None
                     if book:
-                        bids, asks = book.get_snapshot(limit=1)
-                        if bids:
-                            bid_val = float(bids[0][0])
-                            best_bid = str(bids[0][0])
-                        if asks:
-                            ask_val = float(asks[0][0])
-                            best_ask = str(asks[0][0])
-                    rows.append((outcome, _fmt(best_bid), _fmt(best_ask)))
+                        bid_val, ask_val = book.best_bid_ask()
                     raw_rows.append((outcome, bid_val, ask_val))
-                rows.sort(key=lambda r: r[0])
-                raw_rows.sort(key=lambda r: r[0])
-                first = rows[0] if len(rows) > 0 else ("", "", "")
-                second = rows[1] if len(rows) > 1 else ("", "", "")
                 first_raw = raw_rows[0] if len(raw_rows) > 0 else ("", None, None)
                 second_raw = raw_rows[1] if len(raw_rows) > 1 else ("", None, None)
                 current_non_empty = (
-                    first[1] != ""
-                    and first[2] != ""
-                    and second[1] != ""
-                    and second[2] != ""
+                    first_raw[1] is not None
+                    and first_raw[2] is not None
+                    and second_raw[1] is not None
+                    and second_raw[2] is not None
                 )
                 if not seen_non_empty and not current_non_empty:
                     stop_event.wait(1.0)
@@ -839,19 +1067,13 @@ class BookManager:
                         changed = True
                 volatile = last_change_ts and (loop_start - last_change_ts) <= 10.0
                 if current_non_empty and changed:
-                    is_new = not path.exists()
-                    if is_new:
+                    if writer is None:
                         folder.mkdir(parents=True, exist_ok=True)
-                    with path.open("a", newline="") as fh:
+                        fh = path.open("a", newline="")
                         writer = csv.writer(fh)
-                        ask_1 = first_raw[2]
-                        ask_2 = second_raw[2]
-                        spread: float | None = None
-                        if ask_1 is not None and ask_2 is not None:
-                            spread = float(ask_1) + float(ask_2) - 1.0
-                        cond1 = _headerize(first[0])
-                        cond2 = _headerize(second[0])
-                        if is_new:
+                        if fh.tell() == 0:
+                            cond1 = _headerize(first_raw[0])
+                            cond2 = _headerize(second_raw[0])
                             writer.writerow(
                                 [
                                     "time_since_gameStartTime",
@@ -860,24 +1082,39 @@ class BookManager:
                                     "spread",
                                 ]
                             )
-                        writer.writerow(
-                            [
-                                _fmt_elapsed(loop_start - game_start_ts if game_start_ts is not None else None),
-                                first[2],
-                                second[2],
-                                _fmt(str(spread) if spread is not None else ""),
-                            ]
-                        )
+                    ask_1 = first_raw[2]
+                    ask_2 = second_raw[2]
+                    spread: float | None = None
+                    if ask_1 is not None and ask_2 is not None:
+                        spread = float(ask_1) + float(ask_2) - 1.0
+                    writer.writerow(
+                        [
+                            _fmt_elapsed(loop_start - game_start_ts if game_start_ts is not None else None),
+                            _fmt(ask_1),
+                            _fmt(ask_2),
+                            _fmt(spread),
+                        ]
+                    )
+                    pending_rows += 1
                     last_logged_snapshot = current_snapshot
+                if fh is not None and pending_rows and (
+                    pending_rows >= 32 or loop_start - last_flush_ts >= 2.0
+                ):
+                    fh.flush()
+                    pending_rows = 0
+                    last_flush_ts = loop_start
                 stop_event.wait(1.0 if volatile else 4.0)
             reason = self._market_end_reasons.pop(key, None)
-            if reason == "unsubscribed" and path.exists():
-                try:
-                    with path.open("a", newline="") as fh:
-                        writer = csv.writer(fh)
-                        writer.writerow(["END_UNSUBSCRIBED", "", "", ""])
-                except Exception:
-                    pass
+            try:
+                if reason == "unsubscribed" and (fh is not None or path.exists()):
+                    if fh is None:
+                        fh = path.open("a", newline="")
+                    csv.writer(fh).writerow(["END_UNSUBSCRIBED", "", "", ""])
+            except Exception:
+                pass
+            finally:
+                if fh is not None:
+                    fh.close()
             self._market_threads.pop(key, None)
             self._market_stops.pop(key, None)
             self._maybe_archive_event_folder(slug)
@@ -887,7 +1124,7 @@ class BookManager:
         thread.start()
 
     def _maybe_archive_event_folder(self, slug: str) -> None:
-        safe_slug = self._safe_slug(slug)
+        safe_slug = _safe_slug(slug)
         slug_prefix = f"{safe_slug}::"
         if any(k.startswith(slug_prefix) for k in self._market_threads):
             return
@@ -914,6 +1151,7 @@ class BookManager:
         self._log_archiver.startup_preflight()
 
     def _stop_logger(self, asset_id: str) -> None:
+        self._asset_meta_lru.pop(asset_id, None)
         meta = self._asset_meta.pop(asset_id, None)
         if not meta:
             return
@@ -921,6 +1159,7 @@ class BookManager:
         assets = self._market_assets.get(key)
         if assets is not None:
             assets.discard(asset_id)
+            self._rebuild_market_view(key)
             if not assets:
                 self._market_assets.pop(key, None)
                 stop = self._market_stops.get(key)
@@ -928,9 +1167,15 @@ class BookManager:
                     self._market_end_reasons[key] = "unsubscribed"
                     stop.set()
 
+    def _rebuild_order_sub_pairs(self) -> None:
+        self._order_sub_pairs = tuple(
+            (q, self._order_loops[q]) for q in self._order_subs if q in self._order_loops
+        )
+
     def unregister_order_subscriber(self, q: Queue[dict[str, object]]) -> None:
         self._order_subs.discard(q)
         self._order_loops.pop(q, None)
+        self._rebuild_order_sub_pairs()
         if not self._order_subs:
             with self._user_lock:
                 if self._user_socket is not None:
@@ -951,11 +1196,9 @@ class BookManager:
         self._last_user_event_ts = time.time()
         self._last_user_event_type = str(ev.get("type", ""))
         self._user_event_count += 1
-        if str(ev.get("event_type", "")) == "trade":
-            pass
-        # else:
-        #     print(f"User WS event received (type={self._last_user_event_type})")
         event_type = str(ev.get("event_type", ""))
+        # if event_type != "trade":
+        #     print(f"User WS event received (type={self._last_user_event_type})")
         if event_type == "order":
             order_type = str(ev.get("type", "")).upper()
             oid = str(ev.get("id", ""))
@@ -1013,25 +1256,33 @@ class BookManager:
                     {"type": "closed", "order": order, "event": "TRADE", "trade_id": trade_id, "trade_status": trade_status}
                 )
             else:
+                # Trade-level fields are the same for every maker fill; coerce them once.
+                ev_side = _to_side(ev.get("side", ""))
+                ev_asset_id = str(ev.get("asset_id", ""))
+                ev_market = str(ev.get("market", ""))
+                ev_outcome = str(ev.get("outcome", ""))
+                ev_timestamp = _to_int(ev.get("timestamp", 0))
                 for maker in maker_orders:
                     if not isinstance(maker, dict):
                         continue
-                    if api_key and str(maker.get("owner", "")) != api_key:
+                    maker_owner = str(maker.get("owner", ""))
+                    if api_key and maker_owner != api_key:
                         continue
                     oid = str(maker.get("order_id", ""))
                     if not oid:
                         continue
+                    maker_side = maker.get("side")
                     order = {
                         "orderID": oid,
                         "price": str(maker.get("price", "")),
                         "size": str(maker.get("matched_amount", "")),
-                        "side": _to_side(maker.get("side", "")) if maker.get("side") else _to_side(ev.get("side", "")),
-                        "asset_id": str(maker.get("asset_id", "")) or str(ev.get("asset_id", "")),
-                        "market": str(ev.get("market", "")),
-                        "outcome": str(maker.get("outcome", "")) or str(ev.get("outcome", "")),
+                        "side": _to_side(maker_side) if maker_side else ev_side,
+                        "asset_id": str(maker.get("asset_id", "")) or ev_asset_id,
+                        "market": ev_market,
+                        "outcome": str(maker.get("outcome", "")) or ev_outcome,
                         "expiration": 0,
-                        "timestamp": _to_int(ev.get("timestamp", 0)),
-                        "owner": str(maker.get("owner", "")),
+                        "timestamp": ev_timestamp,
+                        "owner": maker_owner,
                         "hash": "",
                     }
                     payloads.append(
@@ -1039,33 +1290,24 @@ class BookManager:
                     )
             if not payloads:
                 return
-            for payload in payloads:
-                self._dispatch_order_payload(payload)
+            self._dispatch_order_payloads(payloads)
             return
         else:
             return
 
-        self._dispatch_order_payload(payload)
-
-    def _dispatch_order_payload(self, payload: dict[str, object]) -> None:
-        self._apply_order_payload_to_index(payload)
-        if not self._order_subs:
-            print("User WS event dropped (no subscribers)")
-        for q in tuple(self._order_subs):
-            loop = self._order_loops.get(q)
-            if loop is None:
-                continue
-
-            def _put_one(
-                q_local: Queue[dict[str, object]] = q,
-                payload_local: dict[str, object] = payload,
-            ) -> None:
-                try:
-                    q_local.put_nowait(payload_local)
-                except Exception:
-                    pass
+        self._dispatch_order_payloads((payload,))
 
-            loop.call_soon_threadsafe(_put_one)
+    def _dispatch_order_payloads(self, payloads: Sequence[dict[str, object]]) -> None:
+        # All fills from one user event go out in a single callback per subscriber, so a
+        # multi-maker trade costs one loop wakeup instead of one per fill.
+        for payload in payloads:
+            self._apply_order_payload_to_index(payload)
+        sub_pairs = self._order_sub_pairs
+        if not sub_pairs:
+            self._user_events_dropped += 1
+            logger.debug("User WS event dropped (no subscribers, total=%s)", self._user_events_dropped)
+        for q, loop in sub_pairs:
+            loop.call_soon_threadsafe(_put_order_payloads, q, payloads)
 
     def _ensure_open_orders_index(self) -> bool:
         with self._open_orders_lock:
@@ -1151,6 +1393,7 @@ class BookManager:
             "last_user_event_ts": self._last_user_event_ts,
             "last_user_event_type": self._last_user_event_type,
             "user_event_count": self._user_event_count,
+            "user_events_dropped": self._user_events_dropped,
         }
 
     def get_last_trade(self, asset_id: str) -> WsLastTrade | None:
@@ -1225,13 +1468,8 @@ class BookManager:
         book = self.active_books.get(asset_id)
         if not book or not getattr(book, "ready", False):
             return None
-        _bids, asks = book.get_snapshot(limit=1)
-        if not asks:
-            return None
-        try:
-            return float(asks[0][0])
-        except Exception:
-            return None
+        _best_bid, best_ask = book.best_bid_ask()
+        return best_ask
 
     def _is_closed_by_best_asks(
         self,
@@ -1486,9 +1724,12 @@ class BookManager:
 
         # Secondary prune: REST existence check.
         to_remove_missing_book: set[str] = set()
-        for aid in managed_after_add:
+        # Independent HTTPS round trips; overlap them instead of paying one RTT per asset.
+        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="book_exists") as pool:
+            exists_futures = {aid: pool.submit(self._rest_order_book_exists, aid) for aid in managed_after_add}
+        for aid, fut in exists_futures.items():
             try:
-                if not self._rest_order_book_exists(aid):
+                if not fut.result():
                     to_remove_missing_book.add(aid)
             except Exception as exc:
                 print(f"Auto subscribe REST existence check failed (asset={aid}): {exc}")
@@ -1517,6 +1758,7 @@ class BookManager:
                     merged_items.pop(key, None)
             self._auto_subscribe_items = merged_items
             self._auto_subscribe_last_run_ts = time.time()
+        self._evict_cold_asset_meta()
 
     def get_auto_subscribe_status(self) -> dict[str, object]:
         with self._auto_subscribe_lock:
@@ -2,10 +2,24 @@ from __future__ import annotations
 
 import difflib
 import re
+from functools import lru_cache
 from typing import Literal, cast
 
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+_SAFE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+_TEAM_RE = re.compile(r"\bwill\s+(.+?)\s+win\b", re.IGNORECASE)
+
 
 def _to_int(value: object, default: int = 0) -> int:
+    # Exact type checks first: str/int/float cover nearly every call, subclasses fall through.
+    t = type(value)
+    if t is str:
+        try:
+            return int(float(cast(str, value)))
+        except Exception:
+            return default
+    if t is int:
+        return cast(int, value)
     if isinstance(value, bool):
         return int(value)
     if isinstance(value, (int, float, str)):
@@ -18,6 +32,14 @@ def _to_int(value: object, default: int = 0) -> int:
 
 
 def _to_float(value: object, default: float = 0.0) -> float:
+    t = type(value)
+    if t is float:
+        return cast(float, value)
+    if t is str or t is int:
+        try:
+            return float(cast(str | int, value))
+        except Exception:
+            return default
     if isinstance(value, bool):
         return float(value)
     if isinstance(value, (int, float, str)):
@@ -34,8 +56,10 @@ def _to_side(value: object) -> Literal["BUY", "SELL"]:
     return cast(Literal["BUY", "SELL"], raw)
 
 
+@lru_cache(maxsize=4096)
 def _normalize_name(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", " ", value.lower()).strip()
+    # Odds team/event names repeat on every /odds/implied call against the same cached feed.
+    return _NORM_RE.sub(" ", value.lower()).strip()
 
 
 def _ratio(a: str, b: str) -> int:
@@ -45,12 +69,12 @@ def _ratio(a: str, b: str) -> int:
 
 
 def _safe_path_segment(value: str) -> str:
-    cleaned = re.sub(r"[^a-zA-Z0-9._-]+", "_", value).strip("_")
+    cleaned = _SAFE_RE.sub("_", value).strip("_")
     return cleaned or "unknown"
 
 
 def _extract_team_from_question(title: str) -> str | None:
-    match = re.search(r"\bwill\s+(.+?)\s+win\b", title, re.IGNORECASE)
+    match = _TEAM_RE.search(title)
     if match:
         return match.group(1).strip()
     return None
@@ -131,8 +131,7 @@ async def lifespan(app: FastAPI):
     registry.stop_auto_subscribe()
     _mem_log_stop.set()
     latency_monitor.stop()
-    asset_ids = list(registry.active_books.keys())
-    for aid in asset_ids:
+    for aid in tuple(registry.active_books):
         registry.release(aid)
     with registry._user_lock:
         if registry._user_socket is not None:
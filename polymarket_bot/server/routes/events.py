@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import json
+import logging
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException
 
 from polymarket_bot.models import GammaEvent, GammaMarket
-from polymarket_bot.server.state import registry
+from polymarket_bot.server.state import logger, registry
 from polymarket_bot.utils import get_game_data
 
 router = APIRouter()
@@ -34,14 +36,10 @@ def resolve_event(query: str, min_volume: float = 0.0) -> GammaEvent:
     if not data:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    filtered_markets: list[GammaMarket] = []
     raw_markets = data.get("markets", [])
-
-    for m in raw_markets:
-        vol = float(m.get("volumeNum", 0.0))
-        if vol >= min_volume:
-            filtered_markets.append(m)
-
+    filtered_markets: list[GammaMarket] = [
+        m for m in raw_markets if float(m.get("volumeNum", 0.0)) >= min_volume
+    ]
     data["markets"] = filtered_markets
     return data
 
@@ -85,12 +83,13 @@ def list_events(
         events = list(combined.values())
     else:
         events = _fetch(tag_id if tag_id and tag_id > 0 else None, window_hours)
-    total_markets = 0
-    for ev in events:
-        markets = ev.get("markets", [])
-        if isinstance(markets, list):
-            total_markets += len(markets)
-    print(f"Gamma events fetched: {len(events)} events, {total_markets} markets")
+    if logger.isEnabledFor(logging.DEBUG):
+        total_markets = 0
+        for ev in events:
+            markets = ev.get("markets", [])
+            if isinstance(markets, list):
+                total_markets += len(markets)
+        logger.debug("Gamma events fetched: %s events, %s markets", len(events), total_markets)
     window_start = now - timedelta(hours=window_before_hours)
     window_end = now + timedelta(hours=window_hours)
     nfl_end_extend = timedelta(hours=48)
@@ -98,9 +97,9 @@ def list_events(
     def _parse(dt_str: str | None) -> datetime | None:
         if not dt_str:
             return None
-        cleaned = dt_str.replace("Z", "+00:00")
+        # fromisoformat accepts the trailing "Z" natively on 3.11+.
         try:
-            return datetime.fromisoformat(cleaned)
+            return datetime.fromisoformat(dt_str)
         except ValueError:
             return None
 
@@ -117,7 +116,8 @@ def list_events(
                     times.append(game_dt)
         return times
 
-    filtered: list[GammaEvent] = []
+    # (earliest game start, event) so each event's times are parsed once for filter and sort.
+    dated: list[tuple[datetime, GammaEvent]] = []
     for ev in events:
         markets = ev.get("markets", [])
         if isinstance(markets, list):
@@ -131,14 +131,8 @@ def list_events(
         is_nfl = "450" in event_tags.split(",") or event_tags.strip() == "450"
         effective_end = window_end + nfl_end_extend if is_nfl else window_end
         if any(window_start <= dt <= effective_end for dt in candidates):
-            filtered.append(ev)
-
-    def _sort_key(ev: GammaEvent) -> datetime:
-        candidates = _candidate_times(ev)
-        if candidates:
-            return min(candidates)
-        return now
+            dated.append((min(candidates), ev))
 
-    filtered.sort(key=_sort_key)
-    print(f"Gamma events in window: {len(filtered)} (fetch_limit={fetch_limit})")
-    return filtered[:limit]
+    logger.debug("Gamma events in window: %s (fetch_limit=%s)", len(dated), fetch_limit)
+    # Only the earliest `limit` are returned, so a bounded heap beats sorting all of them.
+    return [ev for _, ev in heapq.nsmallest(limit, dated, key=lambda item: item[0])]
@@ -9,7 +9,7 @@ from typing import Final, Iterable
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from polymarket_bot.models import GammaMarket, WsBidAsk, WsPayload
+from polymarket_bot.models import GammaMarket, WsBidAsk, WsPayload, dumps_ws
 from polymarket_bot.server.order_utils import normalize_open_orders
 from polymarket_bot.server.settings import BOOKS_STREAM_FULL_EVENT_DRIVEN
 from polymarket_bot.server.state import registry
@@ -32,6 +32,10 @@ WATCH_USER_MAX_SEEN_ASSETS: Final[int] = 20_000
 WATCH_USER_INTERVAL_S: Final[float] = 2.0
 
 
+async def _send_json(client_ws: WebSocket, data: object) -> None:
+    await client_ws.send_text(dumps_ws(data))
+
+
 async def _safe_close(client_ws: WebSocket) -> None:
     try:
         await client_ws.close()
@@ -69,7 +73,7 @@ async def watch_user_endpoint(client_ws: WebSocket, address: str, min_volume: fl
                 trades = []
 
             if trades:
-                await client_ws.send_json({"type": "recent_trades", "trades": trades})
+                await _send_json(client_ws, {"type": "recent_trades", "trades": trades})
 
             new_asset_ids: set[str] = set()
             new_event_slugs: set[str] = set()
@@ -105,7 +109,7 @@ async def watch_user_endpoint(client_ws: WebSocket, address: str, min_volume: fl
                         batch_markets.extend(filtered)
 
                 if batch_markets:
-                    await client_ws.send_json({"type": "new_markets", "markets": batch_markets})
+                    await _send_json(client_ws, {"type": "new_markets", "markets": batch_markets})
 
                 # Record what we’ve seen (bounded).
                 for asset in new_asset_ids:
@@ -141,7 +145,8 @@ async def orders_websocket_endpoint(client_ws: WebSocket) -> None:
         registry.register_order_subscriber(q, asyncio.get_running_loop())
         print(f"Orders WS registered (subscribers={len(registry._order_subs)})")
 
-        await client_ws.send_json(
+        await _send_json(
+            client_ws,
             {"type": "status", "status": "subscribed", "pid": os.getpid(), "server_now": _now_s()}
         )
 
@@ -149,19 +154,19 @@ async def orders_websocket_endpoint(client_ws: WebSocket) -> None:
         try:
             open_orders = await asyncio.to_thread(registry.poly_client.get_open_orders)
             normalized = normalize_open_orders(open_orders)  # type: ignore[arg-type]
-            await client_ws.send_json({"type": "snapshot", "orders": normalized, "server_now": _now_s()})
+            await _send_json(client_ws, {"type": "snapshot", "orders": normalized, "server_now": _now_s()})
         except Exception as e:
-            await client_ws.send_json({"type": "error", "error": str(e), "server_now": _now_s()})
+            await _send_json(client_ws, {"type": "error", "error": str(e), "server_now": _now_s()})
 
         # Loop: either forward an order event, or periodically ping so we detect dead clients.
         while True:
             try:
                 msg = await asyncio.wait_for(q.get(), timeout=ORDER_WS_PING_SECONDS)
                 msg["server_now"] = _now_s()
-                await client_ws.send_json(msg)
+                await _send_json(client_ws, msg)
             except asyncio.TimeoutError:
                 # If the client is gone, this send will raise and we’ll fall out to finally/unregister.
-                await client_ws.send_json({"type": "ping", "server_now": _now_s()})
+                await _send_json(client_ws, {"type": "ping", "server_now": _now_s()})
 
     except WebSocketDisconnect:
         print("Orders WS disconnected")
@@ -218,7 +223,7 @@ async def websocket_endpoint(client_ws: WebSocket, asset_id: str) -> None:
         while True:
             # 1. State Check: If book isn't ready, throttle and wait.
             if not getattr(book, "ready", True):
-                await client_ws.send_json({"status": "loading", "asset_id": asset_id})
+                await _send_json(client_ws, {"status": "loading", "asset_id": asset_id})
                 await asyncio.sleep(0.5) # Heavy throttle during loading
                 continue
 
@@ -230,7 +235,7 @@ async def websocket_endpoint(client_ws: WebSocket, asset_id: str) -> None:
             payload = _build_book_payload(asset_id, book, msg_count, last_trade) #type: ignore
             
             # 4. Send to Frontend
-            await client_ws.send_json(payload)
+            await _send_json(client_ws, payload)
             
             # 5. THE FIX: Strict Fixed Interval
             # By using a flat sleep, you guarantee the React Scheduler (Scheduler.js) 
@@ -317,7 +322,7 @@ async def websocket_books(client_ws: WebSocket) -> None:
                     elapsed = now_mono - last_books_send_mono
                     if elapsed < BOOK_MIN_SEND_INTERVAL_S:
                         await asyncio.sleep(BOOK_MIN_SEND_INTERVAL_S - elapsed)
-                await client_ws.send_json({"type": "books", "updates": updates})
+                await _send_json(client_ws, {"type": "books", "updates": updates})
                 last_books_send_mono = time.monotonic()
     except WebSocketDisconnect:
         return
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 import time
+from typing import Any, cast
 
+from polymarket_bot.clients import Side
 from polymarket_bot.server.helpers import _to_float
 from polymarket_bot.server.models import (
     AutoPairConfig,
@@ -28,10 +30,8 @@ def _best_price_from_book(token_id: str, side: str) -> float | None:
     book = registry.active_books.get(token_id)
     if book is None or not getattr(book, "ready", False):
         return None
-    bids, asks = book.get_snapshot(limit=1)
-    if side == "BUY":
-        return bids[0][0] if bids else None
-    return asks[0][0] if asks else None
+    best_bid, best_ask = book.best_bid_ask()
+    return best_bid if side == "BUY" else best_ask
 
 
 @router.post("/orders/limit")
@@ -217,22 +217,22 @@ def post_market_order(req: MarketOrderRequest) -> dict[str, object]:
         total_liquidity = 0.0
         size_shares = req.amount
         if snapshot:
-            asks = snapshot.get("asks", []) if isinstance(snapshot, dict) else []
-            bids = snapshot.get("bids", []) if isinstance(snapshot, dict) else []
-            if req.side == "BUY" and not asks:
-                raise HTTPException(status_code=400, detail="No asks available for market buy.")
-            if req.side == "SELL" and not bids:
+            # Only the side we'd take from matters; BUY walks asks, SELL walks bids.
+            book_side = "asks" if req.side == "BUY" else "bids"
+            levels: list[dict[str, Any]] = (
+                cast(list[dict[str, Any]], snapshot.get(book_side, [])) if isinstance(snapshot, dict) else []
+            )
+            if not levels:
+                if req.side == "BUY":
+                    raise HTTPException(status_code=400, detail="No asks available for market buy.")
                 raise HTTPException(status_code=400, detail="No bids available for market sell.")
-            if req.side == "BUY":
-                if isinstance(asks[0], dict):
-                    best_price = _to_float(asks[0].get("price", 0))
-                total_liquidity = sum(_to_float(a.get("size", 0)) for a in asks if isinstance(a, dict))
-                if best_price is not None and best_price > 0:
-                    size_shares = req.amount / best_price
-            else:
-                if isinstance(bids[0], dict):
-                    best_price = _to_float(bids[0].get("price", 0))
-                total_liquidity = sum(_to_float(b.get("size", 0)) for b in bids if isinstance(b, dict))
+            if isinstance(levels[0], dict):
+                best_price = _to_float(levels[0].get("price", 0))
+            for lvl in levels:
+                if isinstance(lvl, dict):
+                    total_liquidity += _to_float(lvl.get("size", 0))
+            if req.side == "BUY" and best_price is not None and best_price > 0:
+                size_shares = req.amount / best_price
 
         if best_price is not None and total_liquidity < size_shares:
             start = time.perf_counter()
@@ -280,11 +280,11 @@ def post_market_order(req: MarketOrderRequest) -> dict[str, object]:
         error_text = str(e)
         if "no orders found to match" in error_text or "couldn't be fully filled" in error_text:
             try:
-                best_price = _to_float(
-                    registry.poly_client.get_best_price(
-                        req.token_id, "SELL" if req.side == "BUY" else "BUY"
-                    )
-                )
+                opposite: Side = "SELL" if req.side == "BUY" else "BUY"
+                # Prefer the streamed book's touch; only go to REST when it isn't ready.
+                best_price = _best_price_from_book(req.token_id, opposite)
+                if best_price is None:
+                    best_price = _to_float(registry.poly_client.get_best_price(req.token_id, opposite))
                 size_shares = req.amount
                 if req.side == "BUY" and best_price > 0:
                     size_shares = req.amount / best_price
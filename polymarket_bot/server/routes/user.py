@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, HTTPException
 from py_clob_client.exceptions import PolyApiException
 
@@ -28,11 +30,13 @@ def resolve_user_activity(address: str, limit: int = 50, min_volume: float = 0.0
         if t.get("eventSlug"):
             target_event_slugs.add(t["eventSlug"])
         if t.get("asset"):
-            traded_asset_ids.add(t["asset"])
+            traded_asset_ids.add(sys.intern(t["asset"]))
 
     combined_markets: list[GammaMarket] = []
-    for evt_slug in target_event_slugs:
-        event_data = get_game_data(str(evt_slug))
+    # One Gamma lookup per event; run them side by side instead of paying N round trips.
+    with ThreadPoolExecutor(max_workers=min(8, len(target_event_slugs) or 1)) as pool:
+        events = list(pool.map(get_game_data, target_event_slugs))
+    for event_data in events:
         if not event_data:
             continue
 
@@ -18,6 +18,10 @@ DEFAULT_SMALLEST_SIZE_LEVEL_MIN_LEVEL: int = -4
 DEFAULT_SMALLEST_SIZE_LEVEL_MIN_BUY_PRICE: float = 0.10
 DEFAULT_SMALLEST_SIZE_LEVEL_MAX_SELL_PRICE: float = 0.85
 
+# adaptive strategy: a last trade only counts toward the notional trigger for this long
+# after it was received.
+ADAPTIVE_LAST_TRADE_MAX_AGE_S: float = 60.0
+
 # Single source of truth for auto-subscribe timing.
 AUTO_SUBSCRIBE_ENABLED: bool = True
 AUTO_SUBSCRIBE_REFRESH_INTERVAL_S: float = 200.0
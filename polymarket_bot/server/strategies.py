@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Protocol
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Mapping, Protocol
 
 from polymarket_bot.server.models import AutoPairConfig
 from polymarket_bot.server.settings import (
@@ -18,7 +19,7 @@ def _smallest_level_candidates() -> list[int]:
     return list(range(high, low - 1, -1))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PairContext:
     assets: list[str]
     positions: Dict[str, float]
@@ -26,17 +27,42 @@ class PairContext:
     sell_allowed: bool
     both_over: bool
     best_bids: Dict[str, float]
-    last_trades: Dict[str, dict[str, float | str | int]]
+    last_notionals: Dict[str, float]
     level_sizes: Dict[str, Dict[str, Dict[int, float]]]
-
-
-@dataclass(frozen=True)
+    # Pair partner lookup, built once per context and shared by both assets' decide() calls.
+    _other: Dict[str, str] = field(init=False, repr=False, compare=False)
+    # Same for both assets of the pair, so decide() for the second asset reuses it.
+    max_last_trade_notional: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_other", {self.assets[0]: self.assets[1]})
+        notionals = self.last_notionals
+        best = 0.0
+        for aid in self.assets:
+            notional = notionals.get(aid, 0.0)
+            if notional > best:
+                best = notional
+        object.__setattr__(self, "max_last_trade_notional", best)
+
+    def other_asset(self, asset_id: str) -> str:
+        return self._other.get(asset_id, self.assets[0])
+
+
+@dataclass(frozen=True, slots=True)
 class OrderIntent:
     side: str
     level: int | None = None
     size_multiplier: float | None = None
 
 
+# Intents are immutable, so strategies hand out these shared instances.
+_BUY = OrderIntent(side="BUY")
+_SELL = OrderIntent(side="SELL")
+_BUY_L0_X1_5 = OrderIntent(side="BUY", level=0, size_multiplier=1.5)
+_BUY_LN1 = OrderIntent(side="BUY", level=-1)
+_SELL_LN1_X1 = OrderIntent(side="SELL", level=-1, size_multiplier=1)
+
+
 class AutoStrategy(Protocol):
     name: str
 
@@ -48,7 +74,7 @@ class DefaultStrategy:
     name = "default"
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
-        other_asset = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
+        other_asset = ctx.other_asset(asset_id)
         current_shares = ctx.positions.get(asset_id, 0.0)
         other_shares = ctx.positions.get(other_asset, 0.0)
         current_cfg = config.asset_settings.get(asset_id)
@@ -66,14 +92,14 @@ class DefaultStrategy:
         if has_current_inventory:
             if not ctx.sell_allowed:
                 return []
-            return [OrderIntent(side="SELL")]
+            return [_SELL]
         if has_other_inventory:
             return []
 
         # No meaningful inventory on either side: keep posting BUYs.
         if not ctx.buy_allowed:
             return []
-        return [OrderIntent(side="BUY")]
+        return [_BUY]
 
 
 class DefaultSmallestSizeLevelStrategy:
@@ -93,7 +119,7 @@ class DefaultSmallestSizeLevelStrategy:
         return min(candidates, key=lambda item: (item[1], item[0]))[0]
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
-        other_asset = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
+        other_asset = ctx.other_asset(asset_id)
         current_shares = ctx.positions.get(asset_id, 0.0)
         other_shares = ctx.positions.get(other_asset, 0.0)
         current_cfg = config.asset_settings.get(asset_id)
@@ -137,7 +163,7 @@ class ZeroOnlyStrategy:
         return min(zero_levels)
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
-        other_asset = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
+        other_asset = ctx.other_asset(asset_id)
         current_shares = ctx.positions.get(asset_id, 0.0)
         other_shares = ctx.positions.get(other_asset, 0.0)
         current_cfg = config.asset_settings.get(asset_id)
@@ -169,39 +195,46 @@ class ConservativeStrategy:
     name = "conservative"
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
-        other_asset = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
+        other_asset = ctx.other_asset(asset_id)
         current_shares = ctx.positions.get(asset_id, 0.0)
         other_shares = ctx.positions.get(other_asset, 0.0)
         if current_shares >= 25:
             return []
         exposure_diff = current_shares - other_shares
         if ctx.both_over and ctx.sell_allowed:
-            return [OrderIntent(side="SELL")]
+            return [_SELL]
         if exposure_diff <= -config.auto_sell_min_shares and ctx.buy_allowed:
-            return [OrderIntent(side="BUY")]
+            return [_BUY]
         return []
 
 
+# Indexed by (sell_preferred << 2) | (buy_allowed << 1) | sell_allowed: take the preferred
+# side if it's allowed, otherwise whichever side is.
+_AGGRESSIVE_TABLE: tuple[tuple[OrderIntent, ...], ...] = (
+    (),         # prefer BUY,  neither allowed
+    (_SELL,),   # prefer BUY,  sell only
+    (_BUY,),    # prefer BUY,  buy only
+    (_BUY,),    # prefer BUY,  both
+    (),         # prefer SELL, neither allowed
+    (_SELL,),   # prefer SELL, sell only
+    (_BUY,),    # prefer SELL, buy only
+    (_SELL,),   # prefer SELL, both
+)
+
+
 class AggressiveStrategy:
     name = "aggressive"
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
-        other_asset = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
+        other_asset = ctx.other_asset(asset_id)
         current_shares = ctx.positions.get(asset_id, 0.0)
         other_shares = ctx.positions.get(other_asset, 0.0)
         if current_shares >= 25:
             return []
         exposure_diff = current_shares - other_shares
-        preferred = "SELL" if ctx.both_over or exposure_diff >= config.auto_sell_min_shares else "BUY"
-        if preferred == "BUY" and ctx.buy_allowed:
-            return [OrderIntent(side="BUY")]
-        if preferred == "SELL" and ctx.sell_allowed:
-            return [OrderIntent(side="SELL")]
-        if ctx.buy_allowed:
-            return [OrderIntent(side="BUY")]
-        if ctx.sell_allowed:
-            return [OrderIntent(side="SELL")]
-        return []
+        sell_preferred = ctx.both_over or exposure_diff >= config.auto_sell_min_shares
+        idx = (sell_preferred << 2) | (ctx.buy_allowed << 1) | ctx.sell_allowed
+        return list(_AGGRESSIVE_TABLE[idx])
 
 
 class AdaptiveStrategy:
@@ -209,62 +242,61 @@ class AdaptiveStrategy:
 
     def decide(self, asset_id: str, config: AutoPairConfig, ctx: PairContext) -> list[OrderIntent]:
         # 1. Trigger Logic: Check for high-volume trades (>= $150)
-        triggered: bool = False
-        for aid in ctx.assets:
-            last = ctx.last_trades.get(aid)
-            if isinstance(last, dict):
-                try:
-                    price = float(last.get("price", 0) or 0)
-                    size = float(last.get("size", 0) or 0)
-                    if price * size >= 150:
-                        triggered = True
-                        break
-                except (TypeError, ValueError):
-                    continue
-
-        if not triggered:
+        if ctx.max_last_trade_notional < 150:
             return []
 
-        other_id: str = ctx.assets[1] if asset_id == ctx.assets[0] else ctx.assets[0]
-        bid_self: float = ctx.best_bids.get(asset_id, 0.0)
-        bid_other: float = ctx.best_bids.get(other_id, 0.0)
+        best_bids = ctx.best_bids
+        positions = ctx.positions
+        sell_allowed = ctx.sell_allowed
+
+        other_id: str = ctx.other_asset(asset_id)
+        bid_self: float = best_bids.get(asset_id, 0.0)
+        bid_other: float = best_bids.get(other_id, 0.0)
         
         is_self_favorite: bool = bid_self >= bid_other + 0.05
         fav_id = asset_id if is_self_favorite else other_id
-        shares_fav = float(ctx.positions.get(fav_id, 0.0))
-        shares_self = float(ctx.positions.get(asset_id, 0.0))
+        # Position sizes are stored as floats (_get_positions_cache / _apply_fill_to_positions)
+        shares_fav: float = positions.get(fav_id, 0.0)
+        shares_self: float = positions.get(asset_id, 0.0)
 
         intents: list[OrderIntent] = []
 
         if ctx.buy_allowed:
             if shares_fav <= 5:
                 if is_self_favorite:
-                    intents.append(OrderIntent(side="BUY", level=0, size_multiplier=1.5))
+                    intents.append(_BUY_L0_X1_5)
                 else:
-                    intents.append(OrderIntent(side="BUY", level=-1))
+                    intents.append(_BUY_LN1)
             
             elif is_self_favorite and shares_fav > 5:
-                intents.append(OrderIntent(side="BUY", level=0, size_multiplier=1.5))
-                if ctx.sell_allowed:
-                    intents.append(OrderIntent(side="SELL", level=-1, size_multiplier=1))
+                intents.append(_BUY_L0_X1_5)
+                if sell_allowed:
+                    intents.append(_SELL_LN1_X1)
 
-        if shares_self >= 25 and ctx.sell_allowed:
-            return [OrderIntent(side="SELL", level=-1, size_multiplier=1)]
+        if shares_self >= 25 and sell_allowed:
+            return [_SELL_LN1_X1]
 
         return intents
 
 
-_STRATEGIES: dict[str, AutoStrategy] = {
-    "default": DefaultStrategy(),
-    "default-smallest-size-level": DefaultSmallestSizeLevelStrategy(),
-    "zero-only": ZeroOnlyStrategy(),
-    "conservative": ConservativeStrategy(),
-    "aggressive": AggressiveStrategy(),
-    "adaptive": AdaptiveStrategy(),
-}
+_STRATEGIES: Mapping[str, AutoStrategy] = MappingProxyType(
+    {
+        "default": DefaultStrategy(),
+        "default-smallest-size-level": DefaultSmallestSizeLevelStrategy(),
+        "zero-only": ZeroOnlyStrategy(),
+        "conservative": ConservativeStrategy(),
+        "aggressive": AggressiveStrategy(),
+        "adaptive": AdaptiveStrategy(),
+    }
+)
 
 
 def get_strategy(name: str | None) -> AutoStrategy:
+    # Names are almost always already canonical; only normalize on a miss.
+    if name:
+        hit = _STRATEGIES.get(name)
+        if hit is not None:
+            return hit
     key = (name or "default").strip().lower()
     return _STRATEGIES.get(key, _STRATEGIES["default"])
 
@@ -1,13 +1,22 @@
-import json
+import sys
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Any, Dict, cast, Optional
-from urllib.parse import urlparse # <--- New Import
 from polymarket_bot.config import GAMMA_URL
-from polymarket_bot.models import GammaEvent, GammaMarket
+from polymarket_bot.models import GammaEvent, GammaMarket, loads_json
+
+# Keep-alive pool for Gamma lookups; sized for the concurrent per-slug fetches in /user/resolve.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 def normalize_point(point: float | str | None) -> str:
     if point is None:
         return ""
+    t = type(point)
+    if t is int:
+        return str(point)
+    if t is float:
+        return str(int(point)) if point.is_integer() else str(point)  # type: ignore[union-attr]
     try:
         f_point = float(point)
         if f_point.is_integer():
@@ -17,10 +26,11 @@ def normalize_point(point: float | str | None) -> str:
         return str(point)
 
 def get_fair_prob(*odds: float) -> List[float]:
-    implied = [1 / o for o in odds if o > 1.0]
-    if not implied:
-        return [0.0] * len(odds)
+    # One slot per input so callers can index by outcome; unusable odds (<= 1.0) get 0.0
+    implied = [1 / o if o > 1.0 else 0.0 for o in odds]
     juice = sum(implied)
+    if not juice:
+        return [0.0] * len(odds)
     return [i / juice for i in implied]
 
 def safe_float(val: Any, default: float = 0.0) -> float:
@@ -33,18 +43,19 @@ def get_game_data(user_input: str) -> Optional[GammaEvent]:
     user_input = user_input.strip()
     slug = user_input
     if "polymarket.com" in user_input:
-        path = urlparse(user_input).path.rstrip('/')
-        slug = path.split('/')[-1]
+        # polymarket.com/event/<slug>[/...][?query][#fragment]: the slug is the last path segment
+        path = user_input.split('?', 1)[0].split('#', 1)[0].rstrip('/')
+        slug = path.rpartition('/')[2]
     print(f"🔎 Looking up slug: '{slug}'")
-    resp = requests.get(GAMMA_URL, params={"slug": slug}, timeout=10.0)
+    resp = _SESSION.get(GAMMA_URL, params={"slug": slug}, timeout=10.0)
     resp.raise_for_status()
-    data = cast(List[Dict[str, Any]], resp.json())
+    data = cast(List[Dict[str, Any]], loads_json(resp.content))
     if not data:
         return None
-        
+
     event = cast(GammaEvent, data[0])
     raw_markets = event["markets"]
-    cleaned_markets: List[Dict[str, GammaEvent]] = []
+    cleaned_markets: List[GammaMarket] = []
 
     for m in raw_markets:
         clean_m = m.copy()
@@ -52,8 +63,10 @@ def get_game_data(user_input: str) -> Optional[GammaEvent]:
         out_raw = m["outcomes"]
         clob_raw = m["clobTokenIds"]
         
-        clean_m["outcomes"] = json.loads(out_raw) if isinstance(out_raw, str) else out_raw
-        clean_m["clobTokenIds"] = json.loads(clob_raw) if isinstance(clob_raw, str) else clob_raw
+        clean_m["outcomes"] = loads_json(out_raw) if isinstance(out_raw, str) else out_raw
+        clob_ids = loads_json(clob_raw) if isinstance(clob_raw, str) else clob_raw
+        # Interned so later membership checks against traded/streamed asset ids hit on identity
+        clean_m["clobTokenIds"] = [sys.intern(t) if isinstance(t, str) else t for t in clob_ids]
 
         cleaned_markets.append(clean_m)
 
@@ -71,27 +84,24 @@ def filter_markets_by_asset(
     """
     filtered_output: List[GammaMarket] = []
 
-    for m in raw_markets:
-        # 1. Check Volume First
-        vol = float(m.get("volumeNum", 0.0))
-        if vol < min_volume:
-            continue
+    # 1. Volume cut first; get_game_data already stored volumeNum as a float
+    survivors = [m for m in raw_markets if m.get("volumeNum", 0.0) >= min_volume]
 
-        # 2. Identify which indices (0=Yes, 1=No) match the user's trades
-        keep_indices = [
-            i for i, token_id in enumerate(m["clobTokenIds"]) 
+    for m in survivors:
+        # 2. Keep only the (token, outcome) pairs the user traded, in one pass
+        pairs = [
+            (token_id, outcome)
+            for token_id, outcome in zip(m["clobTokenIds"], m["outcomes"])
             if token_id in valid_assets
         ]
 
-        if not keep_indices:
+        if not pairs:
             continue
 
         # 3. Create a clean copy with ONLY those tokens
         clean_m = m.copy()
-        
-        # Filter lists using the indices we found
-        clean_m["clobTokenIds"] = [m["clobTokenIds"][i] for i in keep_indices]
-        clean_m["outcomes"] = [m["outcomes"][i] for i in keep_indices]
+        clean_m["clobTokenIds"] = [token_id for token_id, _ in pairs]
+        clean_m["outcomes"] = [outcome for _, outcome in pairs]
 
         filtered_output.append(clean_m)
 
@@ -5,6 +5,7 @@ import csv
 import json
 import time
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Any, Set, Tuple, cast
 
@@ -15,7 +16,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # --- IMPORTS FROM PROJECT ---
 from polymarket_bot.config import GIAYN_ADDRESS,REST_URL,GAMMA_URL,OUTPUT_ROOT,TRADES_CSV_PATH
-from polymarket_bot.models import TradeActivity,GammaEvent,WsBookMessage,WsPriceChangeMessage
+from polymarket_bot.models import TradeActivity,GammaEvent,WsBookMessage,WsPriceChangeMessage,loads_json
 from polymarket_bot.clients import PolyClient, PolySocket
 from polymarket_bot.book import OrderBook
 
@@ -23,39 +24,54 @@ from polymarket_bot.book import OrderBook
 POLL_SECONDS = 2.0
 LIMIT = 500
 BOOK_FILENAME = "giayn_book_{placeholder}.csv"
+# Each poll only returns the newest 50 trades, so older hashes can't come back.
+SEEN_HASHES_MAX = 5000
 
-BOOK_FIELDNAMES = [
+# Frozen once at import; the CSV writers iterate these per row.
+BOOK_FIELDNAMES: Tuple[str, ...] = (
     "t_rel_s", "spread", 
     "bid1_price", "bid2_price", "bid3_price",
     "ask1_price", "ask2_price", "ask3_price",
     "bid1_size", "bid2_size", "bid3_size",
     "ask1_size", "ask2_size", "ask3_size",
-    "reason"
-]
+    "reason",
+)
+# Book rows are all numbers plus a fixed reason word, so nothing ever needs csv quoting.
+# They're ASCII and written as bytes: %b for the preformatted text fields, %a (repr) for floats.
+BOOK_HEADER = (",".join(BOOK_FIELDNAMES) + "\r\n").encode("ascii")
+BOOK_ROW_FMT = b"%b,%b," + b",".join([b"%a"] * 12) + b",%b\r\n"
 
-TRADES_FIELDNAMES = [
+TRADES_FIELDNAMES: Tuple[str, ...] = (
     "t_rel_s", "local_ts", "remote_ts_ms", "side", "price", "size", 
     "usdc", "asset", "conditionId", "outcome", "title", "eventSlug", 
-    "tx", "spread"
-]
+    "tx", "spread",
+)
+
+# Stand-in (price, size) for a missing book level; shared, never mutated.
+EMPTY_LEVEL: Tuple[float, float] = (0.0, 0.0)
 
 # --- STATE ---
 start_ts: float = time.time()
-seen_hashes: Set[str] = set()
+seen_hashes: OrderedDict[str, None] = OrderedDict()
 active_events: Dict[str, 'TrackedEvent'] = {}
 asset_map: Dict[str, str] = {}
 placeholder_count: int = 0
 
 # --- UTILS ---
-def r3(x: float | None) -> float | str:
-    return round(x, 3) if isinstance(x, (float, int)) else ""
+def r3(x: float | None) -> str:
+    # Formats straight to text: no intermediate rounded float for csv to repr() again
+    t = type(x)
+    if t is float or t is int:
+        return format(x, ".3f")
+    return ""
 
 def get_placeholder(asset_id: str) -> str:
     global placeholder_count
-    if asset_id not in asset_map:
-        asset_map[asset_id] = f"A{placeholder_count}"
+    code = asset_map.get(asset_id)
+    if code is None:
+        code = asset_map[asset_id] = f"A{placeholder_count}"
         placeholder_count += 1
-    return asset_map[asset_id]
+    return code
 
 # --- CLASS: EVENT MANAGER ---
 class TrackedEvent:
@@ -63,8 +79,11 @@ class TrackedEvent:
         self.slug = slug
         self.assets = assets
         self.books: Dict[str, OrderBook] = {}
-        self.writers: Dict[str, Any] = {}
         self.files: Dict[str, Any] = {}
+        # (book, file) per asset so log_snapshot does one lookup per update
+        self.sinks: Dict[str, Tuple[OrderBook, Any]] = {}
+        # Last top-3 (bids, asks) written per asset; price changes below level 3 don't get a row
+        self.last_levels: Dict[str, Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]] = {}
         
         safe_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", slug)
         event_dir = OUTPUT_ROOT / safe_slug
@@ -78,12 +97,11 @@ class TrackedEvent:
             # 2. Init Logging
             ph = get_placeholder(asset_id)
             path = event_dir / BOOK_FILENAME.format(placeholder=ph)
-            f = open(path, "w", newline="", encoding="utf-8")
-            w = csv.DictWriter(f, fieldnames=BOOK_FIELDNAMES)
-            w.writeheader()
+            f = open(path, "wb")
+            f.write(BOOK_HEADER)
             
             self.files[asset_id] = f
-            self.writers[asset_id] = w
+            self.sinks[asset_id] = (book, f)
 
         # 3. Init Socket
         self.socket = PolySocket(asset_ids=assets)
@@ -93,61 +111,67 @@ class TrackedEvent:
         print(f"✅ Started tracking event: {slug} ({len(assets)} assets)")
 
     def log_snapshot(self, asset_id: str, reason: str) -> None:
-        book = self.books.get(asset_id)
-        writer = self.writers.get(asset_id)
-        if not book or not writer: return
+        sink = self.sinks.get(asset_id)
+        if sink is None: return
+        book, f = sink
 
         bids, asks = book.get_snapshot(limit=3)
+        levels = (bids, asks)
+        if reason != "book" and self.last_levels.get(asset_id) == levels:
+            return
+        self.last_levels[asset_id] = levels
+
         best_bid = bids[0][0] if bids else None
         best_ask = asks[0][0] if asks else None
         
         spread = r3(best_ask - best_bid) if (best_bid is not None and best_ask is not None) else ""
         
-        # Strictly typed helper
-        def get_lvl(lst: List[Tuple[float, float]], idx: int) -> Tuple[float, float]: 
-            return (lst[idx][0], lst[idx][1]) if idx < len(lst) else (0.0, 0.0)
+        # Pad both sides to 3 levels with the shared empty level, then unpack
+        if len(bids) < 3:
+            bids = bids + [EMPTY_LEVEL] * (3 - len(bids))
+        if len(asks) < 3:
+            asks = asks + [EMPTY_LEVEL] * (3 - len(asks))
+        (b1p, b1s), (b2p, b2s), (b3p, b3s) = bids
+        (a1p, a1s), (a2p, a2s), (a3p, a3s) = asks
 
-        b1p, b1s = get_lvl(bids, 0)
-        b2p, b2s = get_lvl(bids, 1)
-        b3p, b3s = get_lvl(bids, 2)
-        
-        a1p, a1s = get_lvl(asks, 0)
-        a2p, a2s = get_lvl(asks, 1)
-        a3p, a3s = get_lvl(asks, 2)
-
-        row: Dict[str, Any] = {
-            "t_rel_s": r3(time.time() - start_ts),
-            "spread": spread,
-            "bid1_price": b1p, "bid1_size": b1s,
-            "bid2_price": b2p, "bid2_size": b2s,
-            "bid3_price": b3p, "bid3_size": b3s,
-            "ask1_price": a1p, "ask1_size": a1s,
-            "ask2_price": a2p, "ask2_size": a2s,
-            "ask3_price": a3p, "ask3_size": a3s,
-            "reason": reason
-        }
-        writer.writerow(row)
-        self.files[asset_id].flush()
+        # Positional, in BOOK_FIELDNAMES order
+        row = (
+            r3(time.time() - start_ts).encode("ascii"), spread.encode("ascii"),
+            b1p, b2p, b3p,
+            a1p, a2p, a3p,
+            b1s, b2s, b3s,
+            a1s, a2s, a3s,
+            reason.encode("ascii"),
+        )
+        # Flushed by the trade loop once per poll (flush_books), not per row on the socket thread
+        f.write(BOOK_ROW_FMT % row)
 
     def on_book(self, msg: WsBookMessage) -> None:
         aid = msg.get("asset_id", "")
-        if aid in self.books:
-            self.books[aid].on_book_snapshot(msg)
+        book = self.books.get(aid)
+        if book is not None:
+            book.on_book_snapshot(msg)
             self.log_snapshot(aid, "book")
 
     def on_price_change(self, msg: WsPriceChangeMessage) -> None:
         changes = msg.get("price_changes", [])
         touched_assets: Set[str] = set()
         
+        books = self.books
         for ch in changes:
             aid = ch.get("asset_id", "")
-            if aid in self.books:
-                self.books[aid].on_price_change(msg)
+            if aid in books:
                 touched_assets.add(aid)
         
+        # OrderBook.on_price_change walks the whole message itself, so apply it once per asset
         for aid in touched_assets:
+            books[aid].on_price_change(msg)
             self.log_snapshot(aid, "price_change")
 
+    def flush_books(self) -> None:
+        for f in self.files.values():
+            f.flush()
+
     def stop(self) -> None:
         self.socket.stop()
         for f in self.files.values():
@@ -160,7 +184,7 @@ def get_event_assets(client: PolyClient, slug: str) -> List[str]:
         url = f"{GAMMA_URL}?slug={slug}" 
         resp = client.session.get(url)
         resp.raise_for_status()
-        data = resp.json()
+        data = loads_json(resp.content)
         
         if not data or not isinstance(data, list): return []
         
@@ -170,7 +194,7 @@ def get_event_assets(client: PolyClient, slug: str) -> List[str]:
         for m in event.get("markets", []):
             token_str = m.get("clobTokenIds", "[]")
             try:
-                tokens_any = json.loads(token_str)
+                tokens_any = loads_json(token_str) if isinstance(token_str, str) else token_str
                 if isinstance(tokens_any, list):
                     # FIX: Strict cast to List[Any] to ensure 't' is recognized
                     tokens_list = cast(List[Any], tokens_any)
@@ -187,8 +211,8 @@ def trade_logger_loop() -> None:
     client = PolyClient()
     OUTPUT_ROOT.mkdir(parents=True, exist_ok=True)
     f_trades = open(TRADES_CSV_PATH, "w", newline="", encoding="utf-8")
-    w_trades = csv.DictWriter(f_trades, fieldnames=TRADES_FIELDNAMES)
-    w_trades.writeheader()
+    w_trades = csv.writer(f_trades)
+    w_trades.writerow(TRADES_FIELDNAMES)
 
     print("📡 Waiting for trades...")
 
@@ -202,54 +226,68 @@ def trade_logger_loop() -> None:
                 "sortDirection": "DESC"
             }
             resp = client.session.get(REST_URL, params=params)
-            trades_raw = resp.json()
-            trades: List[TradeActivity] = cast(List[TradeActivity], trades_raw)
+            trades = cast(List[TradeActivity], loads_json(resp.content))
 
-            new_count = 0
-            sorted_trades = sorted(trades, key=lambda x: x.get("timestamp", 0))
-            
-            for t in sorted_trades:
+            rows: List[Tuple[Any, ...]] = []
+            new_slugs: Dict[str, None] = {}
+            # The page is already sortBy=TIMESTAMP DESC; walking it backwards is oldest-first
+            for t in reversed(trades):
                 tx = t.get("transactionHash", "")
                 if tx in seen_hashes: continue
-                seen_hashes.add(tx)
+                seen_hashes[tx] = None
+                if len(seen_hashes) > SEEN_HASHES_MAX:
+                    seen_hashes.popitem(last=False)
                 
                 slug = t.get("eventSlug", "")
                 asset = t.get("asset", "")
                 
-                row: Dict[str, Any] = {
-                    "t_rel_s": r3(time.time() - start_ts),
-                    "local_ts": r3(time.time()),
-                    "remote_ts_ms": t.get("timestamp"),
-                    "side": t.get("side"),
-                    "price": t.get("price"),
-                    "size": t.get("size"),
-                    "usdc": t.get("usdcSize"),
-                    "asset": get_placeholder(asset) if asset else "",
-                    "conditionId": t.get("conditionId"),
-                    "outcome": t.get("outcome"),
-                    "title": t.get("title"),
-                    "eventSlug": slug,
-                    "tx": tx,
-                    "spread": "" 
-                }
-                w_trades.writerow(row)
-                f_trades.flush()
-                new_count += 1
+                now = time.time()
+                # Positional, in TRADES_FIELDNAMES order
+                row = (
+                    r3(now - start_ts),
+                    r3(now),
+                    t.get("timestamp"),
+                    t.get("side"),
+                    t.get("price"),
+                    t.get("size"),
+                    t.get("usdcSize"),
+                    get_placeholder(asset) if asset else "",
+                    t.get("conditionId"),
+                    t.get("outcome"),
+                    t.get("title"),
+                    slug,
+                    tx,
+                    "",
+                )
+                rows.append(row)
 
                 if slug and slug not in active_events:
-                    print(f"🆕 New Event Detected: {slug}")
-                    assets = get_event_assets(client, slug)
-                    if assets:
-                        tracker = TrackedEvent(slug, assets)
-                        active_events[slug] = tracker
-                    else:
-                        print(f"⚠️ No assets found for {slug}")
+                    new_slugs[slug] = None
+
+            # One write + flush per poll; event lookups run after so a Gamma error can't drop rows
+            if rows:
+                w_trades.writerows(rows)
+                f_trades.flush()
+                print(f"📝 Logged {len(rows)} trades.")
 
-            if new_count > 0:
-                print(f"📝 Logged {new_count} trades.")
+            for slug in new_slugs:
+                print(f"🆕 New Event Detected: {slug}")
+                assets = get_event_assets(client, slug)
+                if assets:
+                    tracker = TrackedEvent(slug, assets)
+                    active_events[slug] = tracker
+                else:
+                    print(f"⚠️ No assets found for {slug}")
 
         except Exception as e:
             print(f"Loop Error: {e}")
+
+        # Book rows reach disk at least once per poll, even when the trade fetch failed
+        try:
+            for tracker in active_events.values():
+                tracker.flush_books()
+        except Exception as e:
+            print(f"Flush Error: {e}")
         
         time.sleep(POLL_SECONDS)
 
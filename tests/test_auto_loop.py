@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from polymarket_bot.book import OrderBook
+from polymarket_bot.server.book_manager import BookManager
+from polymarket_bot.server.models import AutoAssetConfig, AutoPairConfig
+from polymarket_bot.server.settings import ADAPTIVE_LAST_TRADE_MAX_AGE_S
+
+
+def _ready_book(asset_id: str) -> OrderBook:
+    book = OrderBook(asset_id)
+    book.on_book_snapshot(
+        {
+            "event_type": "book",
+            "asset_id": asset_id,
+            "bids": [{"price": "0.45", "size": "100"}, {"price": "0.44", "size": "50"}],
+            "asks": [{"price": "0.55", "size": "100"}, {"price": "0.56", "size": "50"}],
+        }
+    )
+    return book
+
+
+def _manager_with_pair(strategy: str) -> tuple[BookManager, list[dict[str, object]]]:
+    manager = BookManager()
+    submitted: list[dict[str, object]] = []
+
+    def place_limit_order(**kwargs: object) -> None:
+        submitted.append(kwargs)
+        # One pass is enough; stop the loop once the round's orders are out.
+        manager._auto_stop.set()
+
+    manager.poly_client.place_limit_order = place_limit_order  # type: ignore[method-assign,assignment]
+    # Fresh, empty positions cache so no REST fetch is attempted.
+    manager._positions_last_fetch = 1e18
+
+    assets = ["a1", "a2"]
+    for asset in assets:
+        manager.active_books[asset] = _ready_book(asset)
+    config = AutoPairConfig(
+        pair_key="pair",
+        assets=assets,
+        asset_settings={a: AutoAssetConfig(asset_id=a, shares=5) for a in assets},
+        strategy=strategy,
+    )
+    with manager._auto_lock:
+        manager._auto_pairs[config.pair_key] = config
+        manager._publish_auto_pairs()
+    return manager, submitted
+
+
+def _run_one_pass(manager: BookManager, timeout_s: float = 0.5) -> None:
+    # Rounds that submit nothing never set _auto_stop themselves.
+    timer = threading.Timer(timeout_s, manager._auto_stop.set)
+    timer.start()
+    try:
+        manager._run_auto_loop()
+    finally:
+        timer.cancel()
+
+
+def test_auto_loop_submits_intent() -> None:
+    manager, submitted = _manager_with_pair(" Default ")
+
+    _run_one_pass(manager)
+
+    assert {(o["token_id"], o["side"]) for o in submitted} == {("a1", "BUY"), ("a2", "BUY")}
+    assert all(o["price"] == 0.45 and o["size"] == 5 for o in submitted)
+    assert ("a1", "BUY") in manager._auto_last_submit_ts
+
+
+def test_adaptive_fires_on_recent_large_trade() -> None:
+    manager, submitted = _manager_with_pair("adaptive")
+    manager._last_trade_notional["a1"] = (200.0, time.time())
+
+    _run_one_pass(manager)
+
+    assert {(o["token_id"], o["side"]) for o in submitted} == {("a1", "BUY"), ("a2", "BUY")}
+
+
+def test_adaptive_ignores_stale_large_trade() -> None:
+    manager, submitted = _manager_with_pair("adaptive")
+    manager._last_trade_notional["a1"] = (200.0, time.time() - ADAPTIVE_LAST_TRADE_MAX_AGE_S - 1)
+
+    _run_one_pass(manager)
+
+    assert submitted == []
+
+
+def test_disable_auto_trading_shuts_down_executor() -> None:
+    manager = BookManager()
+    executor = manager._auto_executor
+    assert executor is not None
+
+    manager.disable_auto_trading()
+    assert manager._auto_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(time.time)
+
+    manager._ensure_auto_loop()
+    assert manager._auto_executor is not None and manager._auto_executor is not executor
+    manager.disable_auto_trading()
+
+
+def test_positions_cache_survives_failed_fetch() -> None:
+    manager = BookManager()
+    manager.poly_client.get_positions_address = lambda: "0xabc"  # type: ignore[method-assign]
+    manager._positions_cache = {"a1": 25.0}
+
+    def fail(*args: object, **kwargs: object) -> list[object]:
+        raise ConnectionError("positions api down")
+
+    manager.poly_client.fetch_positions = fail  # type: ignore[method-assign,assignment]
+
+    assert manager._get_positions_cache() == {"a1": 25.0}
+    assert manager._positions_last_fetch == 0.0
+    manager.disable_auto_trading()